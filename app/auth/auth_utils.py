@@ -1,37 +1,44 @@
 import uuid
 from datetime import datetime, timedelta, timezone
-from typing import Union
+from typing import Optional, Union
 
 import bcrypt
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import jwt
+import jwt
 
+from app.auth.keys import JWTKey, keyring
+from app.auth.password_pool import password_pool
+from app.auth.token_cache import VerifiedTokenCache
 from app.config import settings
 from app.schemas.auth import UserToken
 
 
-# Кэш ключей — читаем один раз при импорте
-_PRIVATE_KEY: str = settings.auth_jwt.private_key_path.read_text()
-_PUBLIC_KEY: str = settings.auth_jwt.public_key_path.read_text()
-_ALGORITHM: str = settings.auth_jwt.algorithm
 _ACCESS_EXPIRE_MINUTES: int = settings.auth_jwt.access_token_expire_minutes
 
+# Проверенные payload'ы — чтобы не повторять проверку подписи на каждый запрос
+verified_token_cache = VerifiedTokenCache(
+    maxsize=settings.auth_jwt.verified_cache_maxsize,
+    enabled=settings.auth_jwt.verified_cache_enabled,
+)
+
 
 def encode_jwt(
     payload: dict,
     *,
-    private_key: str = _PRIVATE_KEY,
-    algorithm: str = _ALGORITHM,
+    key: Optional[JWTKey] = None,
     expire_minutes: int = _ACCESS_EXPIRE_MINUTES,
     expire_timedelta: Union[timedelta, None] = None,
 ) -> str:
     """
     Создаёт JWT‑токен. Обязательно наличие поля `sub` (ID пользователя).
+    По умолчанию подписывает активным ключом из keyring и кладёт его `kid` в заголовок.
     """
     if "sub" not in payload:
         raise ValueError("payload must contain 'sub' field")
 
+    key = key or keyring.signing_key()
+
     to_encode = payload.copy()
     to_encode["sub"] = str(to_encode["sub"])  # приводим к строке для совместимости
 
@@ -40,21 +47,36 @@ def encode_jwt(
 
     to_encode.update(exp=expire, iat=now)
 
-    return jwt.encode(to_encode, private_key, algorithm=algorithm)
+    return jwt.encode(
+        to_encode, key.private_key, algorithm=key.algorithm, headers={"kid": key.kid}
+    )
 
 
 def decode_jwt(
     token: Union[str, bytes],
     *,
-    public_key: str = _PUBLIC_KEY,
-    algorithm: str = _ALGORITHM,
+    key: Optional[JWTKey] = None,
 ) -> dict:
     """
     Декодирует токен и верифицирует подпись и срок действия.
+    Ключ проверки выбирается по заголовку `kid`; алгоритм берётся из ключа,
+    а не из токена. Успешно проверенные токены кэшируются до их `exp`.
     """
+    cache_key = None
+    if key is None:
+        keyring.maybe_reload()
+        cache_key = verified_token_cache.make_key(token, keyring.generation)
+        cached = verified_token_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     try:
-        payload = jwt.decode(token, public_key, algorithms=[algorithm])
-    except jwt.JWTError as exc:
+        if key is None:
+            key = keyring.verification_key(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                raise HTTPException(status_code=401, detail="Invalid token: unknown key")
+        payload = jwt.decode(token, key.public_key, algorithms=[key.algorithm])
+    except jwt.PyJWTError as exc:
         raise HTTPException(status_code=401, detail="Invalid token") from exc
 
     if "sub" not in payload:
@@ -62,6 +84,8 @@ def decode_jwt(
 
     # гарантируем строковый тип sub
     payload["sub"] = str(payload["sub"])
+    if cache_key is not None:
+        verified_token_cache.set(cache_key, payload)
     return payload
 
 
@@ -74,24 +98,37 @@ def validate_password(password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
+async def hash_password_async(password: str) -> str:
+    """hash_password в пуле bcrypt — не блокирует event loop."""
+    return await password_pool.run(hash_password, password)
+
+
+async def validate_password_async(password: str, hashed_password: str) -> bool:
+    """validate_password в пуле bcrypt — не блокирует event loop."""
+    return await password_pool.run(validate_password, password, hashed_password)
+
+
 def generate_invite_token() -> str:
     return str(uuid.uuid4())
 
 
+# auto_error=False: заголовок проверяет AuthMiddleware; схема нужна для OpenAPI
+_bearer_scheme = HTTPBearer(auto_error=False)
+
+
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer_scheme),
 ) -> UserToken:
     """
-    Декодирует токен из заголовка Authorization и возвращает модель UserToken.
-    """
-    payload = decode_jwt(credentials.credentials)
-
-    is_active: bool = payload.get("is_active", True)
-    if not is_active:
-        raise HTTPException(status_code=403, detail="Account is inactive")
+    Возвращает UserToken текущего пользователя — principal, который
+    AuthMiddleware положил в `request.state.user`.
 
-    return UserToken(
-        user_id=int(payload["sub"]),
-        company_id=payload.get("company_id"),
-        is_admin=payload.get("is_admin", False),
-    )
\ No newline at end of file
+    Токен здесь повторно не декодируется: без principal путь публичный, и
+    проверки отзыва и статуса пользователя на нём не было — такой запрос
+    отклоняется, а не пропускается по одной подписи.
+    """
+    principal = getattr(request.state, "user", None)
+    if isinstance(principal, UserToken):
+        return principal
+    raise HTTPException(status_code=401, detail="Not authenticated")
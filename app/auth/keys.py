@@ -0,0 +1,160 @@
+import logging
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from pydantic import BaseModel, field_validator
+
+from app.config import AuthJWTSettings, settings
+
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+
+
+class JWTKeyConfig(BaseModel):
+    """Описание одного ключа в keyset‑файле."""
+    kid: str
+    algorithm: str
+    public_key_path: Path
+    # ключ без приватной части используется только для проверки подписи
+    private_key_path: Optional[Path] = None
+
+    @field_validator("algorithm")
+    def check_algorithm(cls, v):
+        if v not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported JWT algorithm: {v}")
+        return v
+
+
+class JWTKeySetConfig(BaseModel):
+    """
+    Формат keyset‑файла (JWT_KEYSET_PATH):
+
+        {
+            "active_kid": "2026-10",
+            "keys": [
+                {"kid": "2026-10", "algorithm": "EdDSA",
+                 "private_key_path": "...", "public_key_path": "..."},
+                {"kid": "default", "algorithm": "RS256", "public_key_path": "..."}
+            ]
+        }
+    """
+    active_kid: str
+    keys: list[JWTKeyConfig]
+
+
+class JWTKey:
+    """Загруженный ключ: PEM разбирается один раз, а не на каждую подпись."""
+
+    def __init__(
+        self,
+        kid: str,
+        algorithm: str,
+        public_key: Any,
+        private_key: Any = None,
+    ) -> None:
+        self.kid = kid
+        self.algorithm = algorithm
+        self.public_key = public_key
+        self.private_key = private_key
+
+    @classmethod
+    def from_config(cls, config: JWTKeyConfig) -> "JWTKey":
+        public_key = load_pem_public_key(config.public_key_path.read_bytes())
+        private_key = None
+        if config.private_key_path is not None:
+            private_key = load_pem_private_key(
+                config.private_key_path.read_bytes(), password=None
+            )
+        return cls(config.kid, config.algorithm, public_key, private_key)
+
+
+class KeyRing:
+    """
+    Набор ключей для подписи и проверки JWT.
+
+    Подписывает активный ключ (`active_kid`), проверяет любой ключ из набора
+    по заголовку `kid`. Если задан JWT_KEYSET_PATH, файл перечитывается при
+    изменении (не чаще раза в `reload_interval` секунд) — так ключи можно
+    ротировать без деплоя. Токены без `kid` (выпущенные до ротации)
+    проверяются ключом `settings.auth_jwt.kid`.
+    """
+
+    def __init__(self, jwt_settings: AuthJWTSettings) -> None:
+        self.default_kid = jwt_settings.kid
+        self.keyset_path = jwt_settings.keyset_path
+        self.reload_interval = jwt_settings.keyset_reload_interval
+        # увеличивается при каждой перезагрузке — входит в ключ кэша токенов
+        self.generation = 0
+        self._keys: dict[str, JWTKey] = {}
+        self._active_kid = self.default_kid
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+
+        if self.keyset_path is None:
+            self._keys = {
+                self.default_kid: JWTKey.from_config(
+                    JWTKeyConfig(
+                        kid=self.default_kid,
+                        algorithm=jwt_settings.algorithm,
+                        public_key_path=jwt_settings.public_key_path,
+                        private_key_path=jwt_settings.private_key_path,
+                    )
+                )
+            }
+        else:
+            self._load()
+
+    def _load(self) -> None:
+        mtime = self.keyset_path.stat().st_mtime
+        config = JWTKeySetConfig.model_validate_json(self.keyset_path.read_text())
+        keys = {key.kid: JWTKey.from_config(key) for key in config.keys}
+
+        active = keys.get(config.active_kid)
+        if active is None or active.private_key is None:
+            raise ValueError(
+                f"Active JWT key '{config.active_kid}' is missing or has no private key"
+            )
+
+        self._keys = keys
+        self._active_kid = config.active_kid
+        self._mtime = mtime
+        self.generation += 1
+
+    def maybe_reload(self, force: bool = False) -> None:
+        if self.keyset_path is None:
+            return
+
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+
+        try:
+            if self.keyset_path.stat().st_mtime != self._mtime:
+                self._load()
+        except (OSError, ValueError):
+            # битый или недоступный файл не должен ронять запросы — живём на старых ключах
+            logger.warning("Failed to reload JWT keyset, keeping current keys", exc_info=True)
+
+    def signing_key(self) -> JWTKey:
+        self.maybe_reload()
+        return self._keys[self._active_kid]
+
+    def verification_key(self, kid: Optional[str]) -> Optional[JWTKey]:
+        kid = kid or self.default_kid
+        key = self._keys.get(kid)
+        if key is None:
+            # новый kid мог появиться после ротации — перечитываем набор
+            self.maybe_reload()
+            key = self._keys.get(kid)
+        return key
+
+
+keyring = KeyRing(settings.auth_jwt)
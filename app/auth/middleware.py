@@ -1,13 +1,21 @@
+import logging
 import re
 
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer
-
-from app.repositories.user import UserRepository
+from redis.exceptions import RedisError
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.uow.unit_of_work import UnitOfWork
 from app.auth.auth_utils import decode_jwt
+from app.auth.revocation import RevocationStoreUnavailable, token_revocations
+from app.auth.user_status_cache import UserStatus, user_status_cache
+from app.config import settings
+from app.schemas.auth import UserToken
+
+
+logger = logging.getLogger(__name__)
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/v1/auth/sign-in")
@@ -18,8 +26,6 @@ PUBLIC_PATH_REGEX = [
     r"^/v1/auth/sign-in$",
     r"^/v1/auth/sign-up$",
     r"^/v1/auth/sign-up-complete$",
-    r"^/v1/invites/invite-employee/$",
-    r"^/v1/user/\d+/update-email$",
     r"^/v1/invites/confirm-invite",
     r"^/docs$",
     r"^/redoc$",
@@ -27,32 +33,93 @@ PUBLIC_PATH_REGEX = [
 ]
 
 
-async def auth_middleware(request: Request, call_next):
-    path = request.url.path.rstrip("/")
-    if any(re.match(pattern, path) for pattern in PUBLIC_PATH_REGEX):
-        return await call_next(request)
-    try:
-        token = await oauth2_scheme(request)
-        payload = decode_jwt(token)
-        user_id = int(payload["sub"])
-    except HTTPException as e:
-        return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+# Один скомпилированный матчер вместо цикла re.match по каждому шаблону
+PUBLIC_PATH_MATCHER = re.compile("|".join(f"(?:{pattern})" for pattern in PUBLIC_PATH_REGEX))
+
+
+class AuthMiddleware:
+    """
+    Чистый ASGI‑middleware аутентификации.
+
+    В отличие от `call_next`‑middleware не оборачивает поток ответа:
+    после проверки запрос передаётся приложению с исходными receive/send.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async with UnitOfWork() as uow:
-        user_repo: UserRepository = UserRepository(uow.session)
+        path = scope["path"].rstrip("/")
+        if PUBLIC_PATH_MATCHER.match(path):
+            await self.app(scope, receive, send)
+            return
 
+        request = Request(scope)
         try:
-            user = await user_repo.get_by_id(user_id)
-            if not user or not user.is_active:
+            token = await oauth2_scheme(request)
+            payload = decode_jwt(token)
+            user_id = int(payload["sub"])
+            principal = await self._authenticate(user_id, payload, self._get_uow(scope))
+        except HTTPException as e:
+            response = JSONResponse(
+                status_code=e.status_code, content={"detail": e.detail}, headers=e.headers
+            )
+            await response(scope, receive, send)
+            return
+
+        # principal переиспользуется в get_current_user
+        request.state.user = principal
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _get_uow(scope: Scope) -> UnitOfWork:
+        # UnitOfWork запроса создаёт RequestUnitOfWorkMiddleware
+        uow = scope.get("state", {}).get("uow")
+        return uow if uow is not None else UnitOfWork()
+
+    async def _authenticate(self, user_id: int, payload: dict, uow: UnitOfWork) -> UserToken:
+        try:
+            revoked = await token_revocations.is_revoked(user_id, payload.get("iat", 0))
+        except (RevocationStoreUnavailable, RedisError):
+            # fail closed: путь через БД отзыв не проверяет, отозванный токен прошёл бы
+            logger.warning("Token revocation check failed", exc_info=True)
+            raise HTTPException(status_code=503, detail="Token revocation check is unavailable")
+        if revoked:
+            raise HTTPException(status_code=401, detail="Token revoked")
+
+        # Отзыв проверен — можно довериться claims токена и не ходить в БД
+        if settings.TOKEN_REVOCATION_TRUST_CLAIMS and "company_id" in payload:
+            if not payload.get("is_active", True):
                 raise HTTPException(status_code=403, detail="Inactive account")
+            return UserToken(
+                user_id=user_id,
+                company_id=payload["company_id"],
+                is_admin=payload.get("is_admin", False),
+            )
 
-            request.state.user = {
-                "id": user.id,
-                "company_id": user.company_id,
-                "is_admin": user.is_admin,
-            }
+        status = user_status_cache.get(user_id)
+        if status is None:
+            uow.read_only = True
+            async with uow:
+                user = await uow.user.get_by_id(user_id)
+                if user:
+                    status = UserStatus(
+                        is_active=user.is_active,
+                        company_id=user.company_id,
+                        is_admin=user.is_admin,
+                    )
+                    user_status_cache.set(user_id, status)
 
-        except HTTPException as e:
-            return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+        if not status or not status.is_active:
+            raise HTTPException(status_code=403, detail="Inactive account")
 
-    return await call_next(request)
+        return UserToken(
+            user_id=user_id,
+            company_id=status.company_id,
+            is_admin=status.is_admin,
+        )
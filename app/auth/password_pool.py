@@ -0,0 +1,132 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+from app.config import settings
+
+
+def _timed_call(func: Callable[..., Any], *args: Any) -> tuple[Any, float, float]:
+    """Выполняется в воркере пула: возвращает результат и время начала/конца."""
+    started_at = time.time()
+    result = func(*args)
+    return result, started_at, time.time()
+
+
+class PasswordPool:
+    """
+    Отдельный ограниченный пул для bcrypt, чтобы хеширование не блокировало event loop.
+
+    Если в очереди уже `max_pending` задач, новые сразу получают 503 с
+    `Retry-After`, а не копятся в памяти. Метрики — время ожидания в очереди
+    и время самого хеширования.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, mode: str = "process") -> None:
+        if mode not in ("process", "thread"):
+            raise ValueError("mode must be 'process' or 'thread'")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.mode = mode
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+        self.completed = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.hash_time_total = 0.0
+        self.hash_time_max = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    def _discard_broken(self, executor: Executor) -> None:
+        # умерший воркер (OOM, сигнал) ломает ProcessPoolExecutor навсегда — создаём новый;
+        # сравнение с текущим: параллельные задачи не должны выбросить уже пересозданный пул
+        executor.shutdown(wait=False, cancel_futures=True)
+        if self._executor is executor:
+            self._executor = None
+            self.restarts += 1
+
+    async def _submit(self, func: Callable[..., Any], *args: Any) -> tuple[Any, float, float]:
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._get_executor()
+            submitted_at = time.time()
+            try:
+                result, started_at, finished_at = await loop.run_in_executor(
+                    executor, _timed_call, func, *args
+                )
+            except BrokenProcessPool:
+                self._discard_broken(executor)
+                continue
+            return result, max(started_at - submitted_at, 0.0), finished_at - started_at
+
+        # bcrypt идемпотентен, так что один повтор безопасен; второй сбой подряд — отказ
+        raise HTTPException(
+            status_code=503,
+            detail="Authentication service is unavailable, try again later.",
+            headers={"Retry-After": "1"},
+        )
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Authentication service is busy, try again later.",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        try:
+            result, queue_wait, hash_time = await self._submit(func, *args)
+        finally:
+            self._pending -= 1
+
+        self.completed += 1
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        self.hash_time_total += hash_time
+        self.hash_time_max = max(self.hash_time_max, hash_time)
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        completed = self.completed or 1
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "queue_wait_avg": self.queue_wait_total / completed,
+            "queue_wait_max": self.queue_wait_max,
+            "hash_time_avg": self.hash_time_total / completed,
+            "hash_time_max": self.hash_time_max,
+        }
+
+
+password_pool = PasswordPool(
+    max_workers=settings.PASSWORD_POOL_WORKERS,
+    max_pending=settings.PASSWORD_POOL_MAX_PENDING,
+    mode=settings.PASSWORD_POOL_MODE,
+)
@@ -0,0 +1,128 @@
+import logging
+import math
+import secrets
+import time
+from collections import deque
+from typing import Optional
+
+from fastapi import HTTPException
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+# Проверяет все окна и только если во всех есть место — засчитывает попытку.
+# Отклонённые попытки не занимают место в окне.
+_SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local member = ARGV[3]
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[3 + i])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        retry_after = math.max(retry_after, tonumber(oldest[2]) + window - now)
+    end
+end
+if retry_after > 0 then
+    return tostring(retry_after)
+end
+for _, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, member)
+    redis.call('PEXPIRE', key, math.ceil(window * 1000))
+end
+return '0'
+"""
+
+
+class SlidingWindowLimiter:
+    """
+    Лимит попыток в скользящем окне по нескольким ключам сразу (email, IP).
+
+    Основное хранилище — sorted set'ы в Redis, общие для всех воркеров.
+    Если Redis недоступен, счёт ведётся в памяти воркера — лимит становится
+    нестрогим (на каждый воркер), но bcrypt остаётся защищён.
+    """
+
+    def __init__(self, prefix: str, window: float) -> None:
+        self.prefix = prefix
+        self.window = window
+        self.redis: Optional[Redis] = None
+        self._script = None
+        self._local: dict[str, deque[float]] = {}
+        self._pruned_at = 0.0
+
+    def bind(self, redis: Redis) -> None:
+        self.redis = redis
+        self._script = redis.register_script(_SLIDING_WINDOW_SCRIPT)
+
+    async def hit(self, limits: dict[str, int]) -> None:
+        """
+        Засчитывает попытку по всем ключам `limits` (ключ -> лимит в окне).
+        Если хоть один лимит исчерпан — 429 с Retry-After.
+        """
+        limits = {f"{self.prefix}:{key}": limit for key, limit in limits.items()}
+
+        retry_after: Optional[float] = None
+        if self._script is not None:
+            try:
+                retry_after = float(await self._script(
+                    keys=list(limits),
+                    args=[time.time(), self.window, secrets.token_hex(8), *limits.values()],
+                ))
+            except RedisError as exc:
+                logger.warning("Rate limiter fell back to in-memory counters: %s", exc)
+        if retry_after is None:
+            retry_after = self._hit_local(limits)
+
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many sign-in attempts, try again later.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    def _hit_local(self, limits: dict[str, int]) -> float:
+        now = time.monotonic()
+        retry_after = 0.0
+        for key, limit in limits.items():
+            hits = self._local.setdefault(key, deque())
+            while hits and hits[0] <= now - self.window:
+                hits.popleft()
+            if len(hits) >= limit:
+                retry_after = max(retry_after, hits[0] + self.window - now)
+
+        if retry_after > 0:
+            return retry_after
+
+        for key in limits:
+            self._local[key].append(now)
+        self._prune_local(now)
+        return 0.0
+
+    def _prune_local(self, now: float) -> None:
+        # пустые и устаревшие очереди не должны копиться при переборе email'ов
+        if len(self._local) < 10_000 or now - self._pruned_at < 1.0:
+            return
+        self._pruned_at = now
+        for key in [k for k, hits in self._local.items() if not hits or hits[-1] <= now - self.window]:
+            del self._local[key]
+
+
+sign_in_limiter = SlidingWindowLimiter(
+    prefix=settings.SIGN_IN_LIMIT_PREFIX,
+    window=settings.SIGN_IN_LIMIT_WINDOW,
+)
+
+
+async def throttle_sign_in(email: str, client_ip: Optional[str]) -> None:
+    limits = {f"email:{email.lower()}": settings.SIGN_IN_LIMIT_PER_EMAIL}
+    if client_ip:
+        limits[f"ip:{client_ip}"] = settings.SIGN_IN_LIMIT_PER_IP
+    await sign_in_limiter.hit(limits)
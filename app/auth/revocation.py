@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Компактный вероятностный набор id: без ложноотрицательных ответов."""
+
+    def __init__(self, size_bits: int, num_hashes: int) -> None:
+        self.size_bits = size_bits
+        self.num_hashes = num_hashes
+        self._bits = bytearray((size_bits + 7) // 8)
+
+    def _positions(self, item: int) -> list[int]:
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size_bits for i in range(self.num_hashes)]
+
+    def add(self, item: int) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: int) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationStoreUnavailable(RuntimeError):
+    """Хранилище отзывов (Redis) ещё не подключено."""
+
+
+def _parse_revoked_at(value: str) -> int:
+    # раньше время отзыва писалось как float — такие записи живут до истечения retention
+    return math.floor(float(value))
+
+
+class TokenRevocations:
+    """
+    Отзыв токенов пользователя: в Redis‑хэше хранится user_id -> время отзыва
+    в целых секундах (как `iat` в JWT), все токены с `iat` раньше этого
+    времени считаются недействительными. Токен, выпущенный в ту же секунду,
+    что и отзыв, остаётся действительным: иначе вход сразу после «отозвать все»
+    отклонялся бы до конца retention.
+
+    Каждый воркер держит локальный Bloom‑фильтр отозванных user_id и
+    периодически пересобирает его из Redis. Точная проверка в Redis нужна
+    только когда фильтр отвечает «возможно отозван» или ещё не собран.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        size_bits: int,
+        num_hashes: int,
+        refresh_interval: float,
+        retention: float,
+    ) -> None:
+        self.key = key
+        self.size_bits = size_bits
+        self.num_hashes = num_hashes
+        self.refresh_interval = refresh_interval
+        # дольше срока жизни access‑токена отзыв хранить незачем
+        self.retention = retention
+        self.redis: Optional[Redis] = None
+        self._filter: Optional[BloomFilter] = None
+
+    def bind(self, redis: Redis) -> None:
+        self.redis = redis
+
+    def _require_redis(self) -> Redis:
+        if self.redis is None:
+            raise RevocationStoreUnavailable("Token revocation store is not initialised")
+        return self.redis
+
+    async def revoke_user(self, user_id: int, revoked_at: Optional[int] = None) -> None:
+        """Отзывает все токены пользователя, выпущенные до `revoked_at` (по умолчанию — сейчас)."""
+        redis = self._require_redis()
+
+        revoked_at = int(time.time()) if revoked_at is None else revoked_at
+        await redis.hset(self.key, str(user_id), str(revoked_at))
+        if self._filter is not None:
+            self._filter.add(user_id)
+
+    async def is_revoked(self, user_id: int, issued_at: int) -> bool:
+        """
+        RevocationStoreUnavailable / RedisError, если проверить нельзя —
+        вызывающий должен отказать, а не пропустить токен.
+        """
+        redis = self._require_redis()
+        if self._filter is not None and user_id not in self._filter:
+            return False
+
+        revoked_at = await redis.hget(self.key, str(user_id))
+        return revoked_at is not None and issued_at < _parse_revoked_at(revoked_at)
+
+    async def refresh(self) -> None:
+        entries = await self.redis.hgetall(self.key)
+        now = time.time()
+
+        bloom = BloomFilter(self.size_bits, self.num_hashes)
+        expired = []
+        for user_id, revoked_at in entries.items():
+            if _parse_revoked_at(revoked_at) + self.retention < now:
+                expired.append(user_id)
+            else:
+                bloom.add(int(user_id))
+
+        if expired:
+            await self.redis.hdel(self.key, *expired)
+        self._filter = bloom
+
+    async def run(self, redis: Redis) -> None:
+        """Фоновая задача lifespan: периодически пересобирает фильтр."""
+        self.bind(redis)
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001 — фильтр остаётся прежним до следующей попытки
+                logger.warning("Failed to refresh token revocation filter", exc_info=True)
+            await asyncio.sleep(self.refresh_interval)
+
+
+token_revocations = TokenRevocations(
+    key=settings.TOKEN_REVOCATION_KEY,
+    size_bits=settings.TOKEN_REVOCATION_FILTER_BITS,
+    num_hashes=settings.TOKEN_REVOCATION_FILTER_HASHES,
+    refresh_interval=settings.TOKEN_REVOCATION_REFRESH_INTERVAL,
+    retention=settings.auth_jwt.access_token_expire_minutes * 60,
+)
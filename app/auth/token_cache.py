@@ -0,0 +1,74 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional, Union
+
+
+class VerifiedTokenCache:
+    """
+    Ограниченный LRU‑кэш уже проверенных JWT‑payload'ов.
+
+    Ключ — SHA‑256 от токена (сам токен в памяти не храним) вместе с
+    поколением набора ключей проверки: после ротации ключей старые записи
+    перестают совпадать. Запись живёт не дольше, чем `exp` самого токена.
+    """
+
+    def __init__(self, maxsize: int = 10_000, enabled: bool = True) -> None:
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+
+    @staticmethod
+    def make_key(token: Union[str, bytes], *scope: Hashable) -> tuple:
+        if isinstance(token, str):
+            token = token.encode("utf-8")
+        return hashlib.sha256(token).digest(), *scope
+
+    def get(self, key: tuple) -> Optional[dict]:
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(payload)
+
+    def set(self, key: tuple, payload: dict) -> None:
+        if not self.enabled or self.maxsize <= 0:
+            return
+
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)):
+            # без срока действия не кэшируем — нечем ограничить жизнь записи
+            return
+
+        self._entries[key] = (float(exp), dict(payload))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
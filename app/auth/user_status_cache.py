@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from redis.asyncio import Redis
+
+from app.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# сообщение для сброса всего кэша (например, после массовых изменений)
+INVALIDATE_ALL = "*"
+
+
+class UserStatus(NamedTuple):
+    is_active: bool
+    company_id: int
+    is_admin: bool
+
+
+class UserStatusCache:
+    """
+    Кэш статуса пользователя для auth_middleware в пределах одного воркера.
+
+    Запись живёт не дольше `ttl` секунд — это верхняя граница задержки,
+    с которой деактивация дойдёт до воркера, даже если pub/sub недоступен.
+    Изменения, сделанные через сервисы, рассылаются всем воркерам через
+    Redis‑канал и сбрасывают запись сразу.
+    """
+
+    def __init__(self, ttl: float, maxsize: int, channel: str) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.channel = channel
+        self.redis: Optional[Redis] = None
+        self._entries: OrderedDict[int, tuple[float, UserStatus]] = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[UserStatus]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+
+        expires_at, status = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            return None
+
+        self._entries.move_to_end(user_id)
+        return status
+
+    def set(self, user_id: int, status: UserStatus) -> None:
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+
+        self._entries[user_id] = (time.monotonic() + self.ttl, status)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def publish_invalidation(self, user_id: int) -> None:
+        """Сбрасывает запись локально и во всех остальных воркерах."""
+        self.invalidate(user_id)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.publish(self.channel, str(user_id))
+        except Exception:  # noqa: BLE001 — остальные воркеры догонят по TTL
+            logger.warning("Failed to publish user status invalidation", exc_info=True)
+
+    async def listen(self, redis: Redis) -> None:
+        """
+        Слушает канал инвалидаций. Запускается фоновой задачей в lifespan.
+        После обрыва соединения кэш очищается целиком: сообщения могли потеряться.
+        """
+        self.redis = redis
+        while True:
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode("utf-8")
+                    if data == INVALIDATE_ALL:
+                        self.clear()
+                    else:
+                        self.invalidate(int(data))
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001
+                logger.warning("User status invalidation listener failed", exc_info=True)
+                self.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.reset()
+
+
+user_status_cache = UserStatusCache(
+    ttl=settings.USER_STATUS_CACHE_TTL,
+    maxsize=settings.USER_STATUS_CACHE_MAXSIZE,
+    channel=settings.USER_STATUS_CHANNEL,
+)
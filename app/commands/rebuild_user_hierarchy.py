@@ -0,0 +1,30 @@
+"""
+Пересобирает таблицу user_hierarchy по users.manager_id — для ремонта после
+ручных правок в БД или импорта в обход UserRepository.set_manager.
+
+    python -m app.commands.rebuild_user_hierarchy [--company-id 42]
+"""
+import argparse
+import asyncio
+from typing import Optional
+
+from app.uow.unit_of_work import UnitOfWork
+
+
+async def rebuild(company_id: Optional[int]) -> int:
+    uow = UnitOfWork()
+    async with uow:
+        return await uow.user.rebuild_hierarchy(company_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the manager hierarchy closure table.")
+    parser.add_argument("--company-id", type=int, default=None, help="only this company")
+    args = parser.parse_args()
+
+    rows = asyncio.run(rebuild(args.company_id))
+    print(f"user_hierarchy rebuilt: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
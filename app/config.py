@@ -1,9 +1,9 @@
 from pathlib import Path
-from typing import List
+from typing import Annotated, List, Optional
 
 from dotenv import load_dotenv
 from pydantic import computed_field, Field, field_validator
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent  # корень проекта
@@ -20,7 +20,15 @@ class AuthJWTSettings(BaseSettings):
         default=BASE_DIR / "utils" / "certs" / "jwt-public.pem"
     )
     algorithm: str = "RS256"
+    kid: str = "default"
+    # JSON‑набор ключей для ротации (см. app/auth/keys.py); если не задан —
+    # используется одна пара private_key_path/public_key_path
+    keyset_path: Optional[Path] = None
+    keyset_reload_interval: float = 30.0
     access_token_expire_minutes: int = 600
+    # кэш уже проверенных токенов (см. app/auth/token_cache.py)
+    verified_cache_enabled: bool = True
+    verified_cache_maxsize: int = 10_000
 
     model_config = SettingsConfigDict(env_prefix="JWT_")
 
@@ -32,11 +40,57 @@ class Settings(BaseSettings):
     DB_USER: str
     DB_PASS: str
 
+    # размеры пула — на один воркер gunicorn: всего соединений до
+    # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    # режим совместимости с PgBouncer (transaction pooling)
+    DB_PGBOUNCER_MODE: bool = False
+
+    # реплики для read-only транзакций: "host" или "host:port" через запятую,
+    # учётные данные и имя БД — как у основной
+    DB_REPLICA_HOSTS: Annotated[List[str], NoDecode] = Field(default_factory=list)
+    # после записи остаток запроса читает с основной БД (защита от лага реплик)
+    DB_PIN_PRIMARY_AFTER_WRITE: bool = True
+
     REDIS_HOST: str
     REDIS_PORT: int
 
     CACHE_PREFIX: str = "cache"
 
+    # DEBUG включает заголовки X-DB-* со статистикой SQL в ответах
+    DEBUG: bool = False
+    SQL_ECHO: bool = False
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+
+    # кэш статуса пользователя в auth_middleware (см. app/auth/user_status_cache.py)
+    USER_STATUS_CACHE_TTL: float = 30.0
+    USER_STATUS_CACHE_MAXSIZE: int = 10_000
+    USER_STATUS_CHANNEL: str = "user-status-invalidate"
+
+    # отзыв токенов (см. app/auth/revocation.py); при TRUST_CLAIMS middleware
+    # не обращается к БД, если токен не отозван
+    TOKEN_REVOCATION_KEY: str = "token-revocations"
+    TOKEN_REVOCATION_REFRESH_INTERVAL: float = 10.0
+    TOKEN_REVOCATION_FILTER_BITS: int = 1 << 20
+    TOKEN_REVOCATION_FILTER_HASHES: int = 7
+    TOKEN_REVOCATION_TRUST_CLAIMS: bool = False
+
+    # лимит попыток входа (см. app/auth/rate_limit.py)
+    SIGN_IN_LIMIT_PREFIX: str = "sign-in-limit"
+    SIGN_IN_LIMIT_WINDOW: float = 300.0
+    SIGN_IN_LIMIT_PER_EMAIL: int = 10
+    SIGN_IN_LIMIT_PER_IP: int = 100
+    # таймаут Redis лимитера: зависший Redis должен переводить счёт в память, а не блокировать вход
+    SIGN_IN_LIMIT_REDIS_TIMEOUT: float = 0.25
+
+    # пул для bcrypt (см. app/auth/password_pool.py), размеры — на один воркер gunicorn
+    PASSWORD_POOL_MODE: str = "process"
+    PASSWORD_POOL_WORKERS: int = 2
+    PASSWORD_POOL_MAX_PENDING: int = 64
+
     DEFAULT_COMPANY_NAME: str = "Default Company"
 
     ALLOWED_ORIGINS: List[str] = Field(
@@ -53,7 +107,18 @@ class Settings(BaseSettings):
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
-    @field_validator("ALLOWED_ORIGINS", mode='before')
+    @computed_field
+    def REPLICA_DATABASE_URLS(self) -> List[str]:  # noqa: N802
+        urls = []
+        for replica in self.DB_REPLICA_HOSTS:
+            host, _, port = replica.partition(":")
+            urls.append(
+                f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}"
+                f"@{host}:{port or self.DB_PORT}/{self.DB_NAME}"
+            )
+        return urls
+
+    @field_validator("ALLOWED_ORIGINS", "DB_REPLICA_HOSTS", mode='before')
     def split_origins(cls, v):
         """Разрешить передавать список через запятую в .env"""
         if isinstance(v, str):
@@ -1,24 +1,111 @@
+import itertools
+import os
+import time
+from uuid import uuid4
+
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
+from app.utils.sql_instrumentation import instrument_engine
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, который замеряет время ожидания свободного соединения."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.acquire_count = 0
+        self.acquire_wait_total = 0.0
+        self.acquire_wait_max = 0.0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = time.perf_counter() - started_at
+            self.acquire_count += 1
+            self.acquire_wait_total += wait
+            self.acquire_wait_max = max(self.acquire_wait_max, wait)
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "acquire_count": self.acquire_count,
+            "acquire_wait_avg_ms": self.acquire_wait_total / (self.acquire_count or 1) * 1000,
+            "acquire_wait_max_ms": self.acquire_wait_max * 1000,
+        }
+
+
+def _connect_args() -> dict:
+    if not settings.DB_PGBOUNCER_MODE:
+        return {}
+    # PgBouncer в режиме transaction pooling: подготовленные выражения не переживают
+    # смену серверного соединения, поэтому кэши asyncpg отключаем, а имена делаем уникальными
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+
+def _create_engine(url: str):
+    new_engine = create_async_engine(
+        url,
+        pool_pre_ping=True,
+        echo=settings.SQL_ECHO,
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args=_connect_args(),
+    )
+    # статистика запросов на HTTP‑запрос (см. SQLStatsMiddleware) вместо echo в stdout
+    instrument_engine(new_engine.sync_engine)
+    return new_engine
+
+
+def _create_session_maker(bind) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind=bind,
+        class_=AsyncSession,
+        autoflush=False,
+        autocommit=False,
+        expire_on_commit=False,
+    )
+
+
+engine = _create_engine(settings.DATABASE_URL)
+async_session_maker = _create_session_maker(engine)
+
+# Реплики для read-only транзакций, выбираются по кругу
+replica_engines = [_create_engine(url) for url in settings.REPLICA_DATABASE_URLS]
+replica_session_makers = [_create_session_maker(e) for e in replica_engines]
+_replica_cycle = itertools.cycle(replica_session_makers)
+
+
+def next_replica_session_maker() -> async_sessionmaker | None:
+    """Следующая реплика по кругу; None, если реплики не настроены."""
+    if not replica_session_makers:
+        return None
+    return next(_replica_cycle)
 
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=True,
-    future=True,
-    pool_size=50,
-    max_overflow=100,
-)
-
-async_session_maker = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    autoflush=False,
-    autocommit=False,
-    expire_on_commit=False,
-)
+def pool_stats() -> dict:
+    """Состояние пула соединений текущего воркера."""
+    return {
+        "pid": os.getpid(),
+        "pgbouncer_mode": settings.DB_PGBOUNCER_MODE,
+        "primary": engine.pool.stats(),
+        "replicas": [replica.pool.stats() for replica in replica_engines],
+    }
 
 
 async def get_async_session() -> AsyncSession:
@@ -1,3 +1,6 @@
+import asyncio
+import contextlib
+
 import uvicorn
 from contextlib import asynccontextmanager
 
@@ -8,8 +11,14 @@ from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from redis.asyncio import Redis
 
-from app.auth.middleware import auth_middleware
+from app.auth.middleware import AuthMiddleware
+from app.auth.password_pool import password_pool
+from app.auth.rate_limit import sign_in_limiter
+from app.auth.revocation import token_revocations
+from app.auth.user_status_cache import user_status_cache
 from app.config import settings
+from app.uow.middleware import RequestUnitOfWorkMiddleware
+from app.utils.sql_instrumentation import SQLStatsMiddleware
 from app.routers.v1.tasks import tasks_router
 from app.routers.v1.auth import auth_router
 from app.routers.v1.invites import invite_router
@@ -17,24 +26,53 @@ from app.routers.v1.users import user_router
 from app.routers.v1.departments import department_router
 from app.routers.v1.positions import positions_router
 from app.routers.v1.roles import roles_router
+from app.routers.v1.metrics import metrics_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Инициализация и корректное закрытие подключения к Redis."""
+    """Инициализация и корректное закрытие подключения к Redis.
+
+    Здесь же запускаются фоновые задачи: подписка на инвалидации кэша
+    статусов пользователей и обновление фильтра отозванных токенов.
+    """
     redis: Redis = Redis(
         host=settings.REDIS_HOST,
         port=settings.REDIS_PORT,
         encoding="utf-8",
         decode_responses=True,
     )
+    # отдельный клиент с короткими таймаутами: общий держит блокирующую подписку pub/sub
+    limiter_redis: Redis = Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        encoding="utf-8",
+        decode_responses=True,
+        socket_connect_timeout=settings.SIGN_IN_LIMIT_REDIS_TIMEOUT,
+        socket_timeout=settings.SIGN_IN_LIMIT_REDIS_TIMEOUT,
+    )
     try:
         FastAPICache.init(
             RedisBackend(redis),
             prefix=settings.CACHE_PREFIX,
         )
-        yield
+        sign_in_limiter.bind(limiter_redis)
+        token_revocations.bind(redis)
+        background = [
+            asyncio.create_task(user_status_cache.listen(redis)),
+            asyncio.create_task(token_revocations.run(redis)),
+        ]
+        try:
+            yield
+        finally:
+            for task in background:
+                task.cancel()
+            for task in background:
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
     finally:
+        password_pool.shutdown()
+        await limiter_redis.close()
         await redis.close()
 
 
@@ -52,7 +90,9 @@ middleware = [
             "Access-Authorization",
         ],
     ),
-    Middleware(auth_middleware),  # убедитесь, что auth_middleware реализует ASGI‑сигнатуру
+    Middleware(SQLStatsMiddleware),  # снаружи AuthMiddleware — считаем и его запросы
+    Middleware(RequestUnitOfWorkMiddleware),  # один UnitOfWork на запрос для auth и сервисов
+    Middleware(AuthMiddleware),
 ]
 
 app = FastAPI(
@@ -72,10 +112,14 @@ app.include_router(user_router, prefix=API_PREFIX)
 app.include_router(department_router, prefix=API_PREFIX)
 app.include_router(positions_router, prefix=API_PREFIX)
 app.include_router(roles_router, prefix=API_PREFIX)
+app.include_router(metrics_router, prefix=API_PREFIX)
 
 # ---- Локальный запуск (только для разработки) ----
 # В продакшене приложение запускается командой:
-#   uvicorn app.main:app --host 0.0.0.0 --port 8000
+#   uvicorn app.main:app --host 0.0.0.0 --port 8000 \
+#       --proxy-headers --forwarded-allow-ips="$FORWARDED_ALLOW_IPS"
+# FORWARDED_ALLOW_IPS — адреса обратного прокси: только от них принимается
+# X-Forwarded-For, иначе request.client.host — это адрес самого прокси.
 # --------------------------------------------------
 if __name__ == "__main__":  # pragma: no cover
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
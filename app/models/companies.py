@@ -12,5 +12,9 @@ class CompanyModel(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(unique=True, nullable=False)
-    employees: Mapped[list["UserModel"]] = relationship(back_populates="company")
-    departments: Mapped[list["DepartmentModel"]] = relationship("Department", back_populates="company")
+    employees: Mapped[list["UserModel"]] = relationship(
+        back_populates="company", lazy="raise_on_sql"
+    )
+    departments: Mapped[list["DepartmentModel"]] = relationship(
+        "DepartmentModel", back_populates="company", lazy="raise_on_sql"
+    )
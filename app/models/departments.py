@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy_utils.types.ltree import LtreeType
 from typing import Optional, TYPE_CHECKING
@@ -13,6 +13,21 @@ if TYPE_CHECKING:
 
 class DepartmentModel(Base):
     __tablename__ = "departments"
+    __table_args__ = (
+        # @> и <@ (предки, поддерево) B-tree не использует — нужен GiST;
+        # siglen больше 8 байт по умолчанию: меньше ложных совпадений на глубоких деревьях
+        Index(
+            "ix_departments_path_gist", "path",
+            postgresql_using="gist",
+            postgresql_ops={"path": "gist_ltree_ops(siglen=100)"},
+        ),
+        # запросы иерархии всегда ограничены company_id; int в GiST — расширение btree_gist
+        Index(
+            "ix_departments_company_id_path_gist", "company_id", "path",
+            postgresql_using="gist",
+            postgresql_ops={"path": "gist_ltree_ops(siglen=100)"},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(nullable=False)
@@ -21,13 +36,18 @@ class DepartmentModel(Base):
     manager_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("users.id"), nullable=True
     )
-    company: Mapped["CompanyModel"] = relationship("Company", back_populates="departments")
+    company: Mapped["CompanyModel"] = relationship(
+        "CompanyModel", back_populates="departments", lazy="raise_on_sql"
+    )
     manager: Mapped[Optional["UserModel"]] = relationship(
-        "User", back_populates="managed_departments", foreign_keys=[manager_id]
+        "UserModel", back_populates="managed_departments", foreign_keys=[manager_id],
+        lazy="raise_on_sql",
     )
     employees: Mapped[list["UserModel"]] = relationship(
-        "User", back_populates="department", foreign_keys="User.department_id"
+        "UserModel", back_populates="department", foreign_keys="UserModel.department_id",
+        lazy="raise_on_sql",
     )
     role_assignments: Mapped[list["RoleAssignmentModel"]] = relationship(
-        "RoleAssignment", back_populates="department"
+        "RoleAssignmentModel", back_populates="department",
+        lazy="raise_on_sql",
     )
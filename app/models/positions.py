@@ -17,6 +17,8 @@ class PositionModel(Base):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(nullable=False)
     company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"), nullable=False)
-    users: Mapped[list["UserModel"]] = relationship("User", back_populates="position")
+    users: Mapped[list["UserModel"]] = relationship(
+        "UserModel", back_populates="position", lazy="raise_on_sql"
+    )
     description: Mapped[Optional[str]] = mapped_column(nullable=True)
 
@@ -19,7 +19,10 @@ class RoleAssignmentModel(Base):
     )
     role_name: Mapped[str] = mapped_column(nullable=False)
 
-    user: Mapped["UserModel"] = relationship("User", back_populates="role_assignments")
+    user: Mapped["UserModel"] = relationship(
+        "UserModel", back_populates="role_assignments", lazy="raise_on_sql"
+    )
     department: Mapped["DepartmentModel"] = relationship(
-        "Department", back_populates="role_assignments"
+        "DepartmentModel", back_populates="role_assignments",
+        lazy="raise_on_sql",
     )
\ No newline at end of file
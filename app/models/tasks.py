@@ -26,16 +26,16 @@ class TaskModel(Base):
     author_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     responsible_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     observers: Mapped[list["UserModel"]] = relationship(
-        "User",
+        "UserModel",
         secondary="task_observers",
         back_populates="observed_tasks",
-        lazy="joined",
+        lazy="raise_on_sql",
     )
     executors: Mapped[list["UserModel"]] = relationship(
-        "User",
+        "UserModel",
         secondary="task_executors",
         back_populates="assigned_tasks",
-        lazy="joined",
+        lazy="raise_on_sql",
     )
     deadline: Mapped[Optional[str]] = mapped_column(nullable=True)
     status: Mapped[str] = mapped_column(
@@ -0,0 +1,25 @@
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class UserHierarchyModel(Base):
+    """
+    Замыкание иерархии руководителей: строка на каждую пару
+    (руководитель любого уровня, подчинённый). depth=1 — прямой подчинённый.
+    Поддерживается UserRepository.set_manager, чинится rebuild_hierarchy.
+    """
+
+    __tablename__ = "user_hierarchy"
+    __table_args__ = (
+        Index("ix_user_hierarchy_descendant_id_depth", "descendant_id", "depth"),
+    )
+
+    ancestor_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    depth: Mapped[int] = mapped_column(nullable=False)
@@ -1,5 +1,5 @@
 from typing import Optional, TYPE_CHECKING
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -14,6 +14,10 @@ if TYPE_CHECKING:
 
 class UserModel(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # прямые подчинённые (профиль "subordinates") и пересборка user_hierarchy
+        Index("ix_users_company_id_manager_id", "company_id", "manager_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     email: Mapped[str] = mapped_column(unique=True, index=True)
@@ -23,35 +27,47 @@ class UserModel(Base):
     is_active: Mapped[bool] = mapped_column(default=True)
     is_admin: Mapped[bool] = mapped_column(default=False)
     company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"))
-    company: Mapped["CompanyModel"] = relationship("Company", back_populates="employees")
+    company: Mapped["CompanyModel"] = relationship(
+        "CompanyModel", back_populates="employees", lazy="raise_on_sql"
+    )
     position_id: Mapped[int] = mapped_column(ForeignKey("positions.id"), nullable=True)
-    position: Mapped["PositionModel"] = relationship("Position", back_populates="users")
+    position: Mapped["PositionModel"] = relationship(
+        "PositionModel", back_populates="users", lazy="raise_on_sql"
+    )
     department_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("departments.id"), nullable=True
     )
     department: Mapped["DepartmentModel"] = relationship(
-        "Department", back_populates="employees", foreign_keys=[department_id]
+        "DepartmentModel", back_populates="employees", foreign_keys=[department_id],
+        lazy="raise_on_sql",
     )
     managed_departments: Mapped[list["DepartmentModel"]] = relationship(
-        "Department", back_populates="manager", foreign_keys="Department.manager_id"
+        "DepartmentModel", back_populates="manager", foreign_keys="DepartmentModel.manager_id",
+        lazy="raise_on_sql",
     )
     manager_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("users.id"), nullable=True
     )
     manager: Mapped[Optional["UserModel"]] = relationship(
-        "User", remote_side="User.id", back_populates="subordinates"
+        "UserModel", remote_side="UserModel.id", back_populates="subordinates",
+        lazy="raise_on_sql",
+    )
+    subordinates: Mapped[list["UserModel"]] = relationship(
+        "UserModel", back_populates="manager", lazy="raise_on_sql"
     )
-    subordinates: Mapped[list["UserModel"]] = relationship("User", back_populates="manager", lazy="joined")
     role_assignments: Mapped[list["RoleAssignmentModel"]] = relationship(
-        "RoleAssignment", back_populates="user"
+        "RoleAssignmentModel", back_populates="user",
+        lazy="raise_on_sql",
     )
     observed_tasks: Mapped[list["TaskModel"]] = relationship(
-        "Task",
+        "TaskModel",
         secondary="task_observers",
         back_populates="observers",
+        lazy="raise_on_sql",
     )
     assigned_tasks: Mapped[list["TaskModel"]] = relationship(
-        "Task",
+        "TaskModel",
         secondary="task_executors",
         back_populates="executors",
+        lazy="raise_on_sql",
     )
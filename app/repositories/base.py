@@ -1,12 +1,69 @@
+import base64
+import binascii
+import json
 from abc import ABC, abstractmethod
-from collections.abc import Sequence
-from typing import TYPE_CHECKING, Any, Never, Optional
+from collections.abc import AsyncIterator, Sequence
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import TYPE_CHECKING, Any, NamedTuple, Never, Optional
 
-from sqlalchemy import delete, insert, select, update
+from sqlalchemy import Column, Executable, Select, delete, func, insert, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.repositories.filters import compile_filters, compile_order_by
 
 if TYPE_CHECKING:
-    from sqlalchemy.engine import Result
+    from sqlalchemy.engine import Result, Row, ScalarResult
+
+
+class Page(NamedTuple):
+    items: list[Any]
+    # None — страниц больше нет
+    next_cursor: Optional[str]
+
+
+def _cursor_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot put {type(value).__name__} into a cursor")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), default=_cursor_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Column]) -> list[Any]:
+    """Значения ключа из курсора, приведённые к python‑типам колонок."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+
+    result = []
+    for column, value in zip(columns, values):
+        python_type = column.type.python_type
+        if not isinstance(value, python_type):
+            try:
+                value = (
+                    python_type.fromisoformat(value)
+                    if hasattr(python_type, "fromisoformat")
+                    else python_type(value)
+                )
+            except (TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+        result.append(value)
+    return result
 
 
 class AbstractRepository(ABC):
@@ -21,6 +78,15 @@ class AbstractRepository(ABC):
     async def add_one_and_get_object(self, *args: Any, **kwargs: Any) -> Never:
         raise NotImplementedError
 
+    async def add_many(self, *args: Any, **kwargs: Any) -> Never:
+        raise NotImplementedError
+
+    async def update_many(self, *args: Any, **kwargs: Any) -> Never:
+        raise NotImplementedError
+
+    async def upsert_many(self, *args: Any, **kwargs: Any) -> Never:
+        raise NotImplementedError
+
     async def get_by_query_one_or_none(self, *args: Any, **kwargs: Any) -> Never:
         raise NotImplementedError
 
@@ -41,11 +107,53 @@ class AbstractRepository(ABC):
         raise NotImplementedError
 
 
+_LOADERS = {"selectin": selectinload, "joined": joinedload}
+
+
 class SqlAlchemyRepository(AbstractRepository):
     model = None
+    # Профили загрузки связей: имя -> {связь: "selectin" | "joined"}, выбираются
+    # параметром `profile` методов чтения. Связи моделей объявлены
+    # lazy="raise_on_sql", так что по умолчанию ("bare") читаются только колонки.
+    loading_profiles: dict[str, dict[str, str]] = {}
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, plain_rows: bool = False) -> None:
         self.session = session
+        # plain_rows: чтение возвращает Row с колонками модели, без identity map
+        self.plain_rows = plain_rows
+
+    def _options(self, profile: str) -> list:
+        if profile == "bare":
+            return []
+        try:
+            relations = self.loading_profiles[profile]
+        except KeyError:
+            raise ValueError(f"Unknown loading profile {profile!r} for {type(self).__name__}")
+        return [
+            _LOADERS[strategy](getattr(self.model, relation))
+            for relation, strategy in relations.items()
+        ]
+
+    def _select(self, profile: str = "bare") -> Select:
+        if self.plain_rows:
+            return select(*self.model.__table__.columns)
+        return select(self.model).options(*self._options(profile))
+
+    def _rows(self, res: "Result") -> "ScalarResult | Result":
+        return res if self.plain_rows else res.scalars()
+
+    def _filters(self, filters: dict[str, Any]) -> list:
+        # равенство и `колонка__оператор` (см. app/repositories/filters.py)
+        return compile_filters(self.model.__table__, filters)
+
+    def _order_and_limit(
+        self, query: Select, order_by: Sequence[str], limit: Optional[int]
+    ) -> Select:
+        if order_by:
+            query = query.order_by(*compile_order_by(self.model.__table__, order_by))
+        if limit is not None:
+            query = query.limit(limit)
+        return query
 
     async def add_one(self, **kwargs: Any) -> None:
         query = insert(self.model).values(**kwargs)
@@ -61,18 +169,232 @@ class SqlAlchemyRepository(AbstractRepository):
         obj: Result = await self.session.execute(query)
         return obj.scalar_one()
 
-    async def get_by_id(self, obj_id: int) -> Optional[Any]:
+    async def add_many(
+        self, rows: Sequence[dict[str, Any]], returning_ids: bool = False
+    ) -> Optional[list[int]]:
+        """
+        Вставляет пачку строк одним вызовом: asyncpg выполняет executemany,
+        с RETURNING — многострочные INSERT ... VALUES. id возвращаются
+        в порядке `rows`.
+        """
+        if not rows:
+            return [] if returning_ids else None
+        query = insert(self.model)
+        if not returning_ids:
+            await self.session.execute(query, rows)
+            return None
+        res: Result = await self.session.execute(
+            query.returning(self.model.id, sort_by_parameter_order=True), rows
+        )
+        return list(res.scalars())
+
+    async def update_many(self, values_by_id: dict[int, dict[str, Any]]) -> None:
+        """Обновляет строки по id (id -> новые значения) одним executemany."""
+        if not values_by_id:
+            return
+        await self.session.execute(
+            update(self.model),
+            [{"id": obj_id, **values} for obj_id, values in values_by_id.items()],
+        )
+
+    async def upsert_many(
+        self,
+        rows: Sequence[dict[str, Any]],
+        index_elements: Sequence[str],
+        update_fields: Optional[Sequence[str]] = None,
+        returning_ids: bool = False,
+    ) -> Optional[list[int]]:
+        """
+        INSERT ... ON CONFLICT (index_elements) пачкой строк.
+
+        `update_fields` — колонки, которые перезаписываются при конфликте
+        (по умолчанию все переданные, кроме ключа); пустой список — DO NOTHING.
+        С DO NOTHING RETURNING не возвращает id пропущенных строк.
+        """
+        if not rows:
+            return [] if returning_ids else None
+        if update_fields is None:
+            update_fields = [key for key in rows[0] if key not in index_elements]
+
+        query = pg_insert(self.model)
+        if update_fields:
+            query = query.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={field: query.excluded[field] for field in update_fields},
+            )
+        else:
+            query = query.on_conflict_do_nothing(index_elements=index_elements)
+
+        if not returning_ids:
+            await self.session.execute(query, rows)
+            return None
+        res: Result = await self.session.execute(
+            query.returning(self.model.id, sort_by_parameter_order=bool(update_fields)), rows
+        )
+        return list(res.scalars())
+
+    async def get_by_id(self, obj_id: int, profile: str = "bare") -> Optional[Any]:
+        # session.get не догружает связи объекта, уже лежащего в identity map
+        if self.plain_rows or profile != "bare":
+            return await self.get_by_query_one_or_none(id=obj_id, profile=profile)
         return await self.session.get(self.model, obj_id)
 
-    async def get_by_query_one_or_none(self, **kwargs: Any) -> Any | None:
-        query = select(self.model).filter_by(**kwargs)
+    async def get_by_query_one_or_none(self, profile: str = "bare", **kwargs: Any) -> Any | None:
+        query = self._select(profile).where(*self._filters(kwargs))
         res: Result = await self.session.execute(query)
-        return res.scalar_one_or_none()
+        return self._rows(res).one_or_none()
+
+    async def get_by_query_all(
+        self,
+        order_by: Sequence[str] = (),
+        limit: Optional[int] = None,
+        profile: str = "bare",
+        **kwargs: Any,
+    ) -> Sequence[model]:
+        query = self._select(profile).where(*self._filters(kwargs))
+        query = self._order_and_limit(query, order_by, limit)
+        res: Result = await self.session.execute(query)
+        return self._rows(res).all()
+
+    async def get_by_ids(self, ids: Sequence[int], profile: str = "bare") -> list[Optional[Any]]:
+        """Одним запросом; результат в порядке `ids`, None для отсутствующих."""
+        if not ids:
+            return []
+        found = {
+            obj.id: obj for obj in await self.get_by_query_all(id__in=set(ids), profile=profile)
+        }
+        return [found.get(obj_id) for obj_id in ids]
+
+    async def explain_by_query(
+        self, order_by: Sequence[str] = (), limit: Optional[int] = None, **kwargs: Any
+    ) -> list[str]:
+        """
+        План запроса get_by_query_all с этими фильтрами (EXPLAIN без выполнения) —
+        чтобы проверить, что частые фильтры идут по индексу, а не Seq Scan.
+        """
+        query = select(*self.model.__table__.columns).where(*self._filters(kwargs))
+        return await self.explain(self._order_and_limit(query, order_by, limit))
+
+    async def explain(self, query: Executable) -> list[str]:
+        """EXPLAIN произвольного запроса репозитория (SELECT, UPDATE, DELETE) без выполнения."""
+        compiled = query.compile(
+            dialect=self.session.bind.dialect, compile_kwargs={"literal_binds": True}
+        )
+        res: Result = await self.session.execute(text(f"EXPLAIN {compiled}"))
+        return list(res.scalars())
+
+    def plan_uses_index(self, plan: Sequence[str], index: Optional[str] = None) -> bool:
+        """
+        Без `index` — в плане нет Seq Scan по таблице модели; с `index` —
+        есть Index Scan / Bitmap Index Scan именно по этому индексу.
+        """
+        if index is None:
+            return not any(f"Seq Scan on {self.model.__tablename__}" in line for line in plan)
+        markers = (
+            f"Index Scan using {index} ",
+            f"Index Only Scan using {index} ",
+            f"Bitmap Index Scan on {index} ",
+        )
+        return any(marker in line for line in plan for marker in markers)
+
+    async def uses_index(self, index: Optional[str] = None, **kwargs: Any) -> bool:
+        return self.plan_uses_index(await self.explain_by_query(**kwargs), index)
+
+    def _select_columns(self, columns: Sequence[str]) -> Select:
+        # колонки таблицы, а не атрибуты модели: без eager‑загрузок и identity map
+        table = self.model.__table__
+        return select(*(table.c[name] for name in columns))
+
+    async def get_columns_by_id(self, obj_id: int, columns: Sequence[str]) -> Optional["Row"]:
+        return await self.get_columns_by_query_one_or_none(columns, id=obj_id)
 
-    async def get_by_query_all(self, **kwargs: Any) -> Sequence[model]:
-        query = select(self.model).filter_by(**kwargs)
+    async def get_columns_by_query_one_or_none(
+        self, columns: Sequence[str], **kwargs: Any
+    ) -> Optional["Row"]:
+        """Только нужные колонки: Row с доступом по имени (`row.id`) или как к кортежу."""
+        query = self._select_columns(columns).where(*self._filters(kwargs))
         res: Result = await self.session.execute(query)
-        return res.scalars().all()
+        return res.one_or_none()
+
+    async def get_columns_by_query_all(
+        self,
+        columns: Sequence[str],
+        order_by: Sequence[str] = (),
+        limit: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Sequence["Row"]:
+        query = self._select_columns(columns).where(*self._filters(kwargs))
+        query = self._order_and_limit(query, order_by, limit)
+        res: Result = await self.session.execute(query)
+        return res.all()
+
+    async def exists_by_query(self, **kwargs: Any) -> bool:
+        query = select(select(self.model.__table__.c.id).where(*self._filters(kwargs)).exists())
+        res: Result = await self.session.execute(query)
+        return res.scalar_one()
+
+    async def count_by_query(self, **kwargs: Any) -> int:
+        query = select(func.count()).select_from(self.model.__table__).where(*self._filters(kwargs))
+        res: Result = await self.session.execute(query)
+        return res.scalar_one()
+
+    async def get_page(
+        self,
+        order_by: str = "id",
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        descending: bool = False,
+        **kwargs: Any,
+    ) -> Page:
+        """
+        Keyset‑пагинация: страница после `cursor`, упорядоченная по `order_by`
+        (и по id для однозначности). В отличие от OFFSET стоимость не растёт
+        с номером страницы, если есть индекс по (order_by, id).
+        """
+        table = self.model.__table__
+        column = table.c[order_by]
+        if column.nullable:
+            raise ValueError(f"Cannot paginate by nullable column {order_by}")
+        key_columns = [column] if column.primary_key else [column, table.c.id]
+
+        query = self._select().where(*self._filters(kwargs))
+        if cursor is not None:
+            key = tuple_(*key_columns)
+            values = tuple_(*decode_cursor(cursor, key_columns))
+            query = query.where(key < values if descending else key > values)
+        query = query.order_by(
+            *(c.desc() if descending else c.asc() for c in key_columns)
+        ).limit(limit + 1)
+
+        res: Result = await self.session.execute(query)
+        items = list(self._rows(res).all())
+        if len(items) <= limit:
+            return Page(items=items, next_cursor=None)
+
+        items = items[:limit]
+        last = items[-1]
+        return Page(
+            items=items,
+            next_cursor=encode_cursor([getattr(last, c.key) for c in key_columns]),
+        )
+
+    async def stream_by_query(
+        self, chunk_size: int = 1000, **kwargs: Any
+    ) -> AsyncIterator[list[Any]]:
+        """
+        Читает выборку серверным курсором и отдаёт её пачками по `chunk_size`:
+        память не зависит от размера выборки. Вызывать внутри транзакции.
+        """
+        query = (
+            self._select()
+            .where(*self._filters(kwargs))
+            .order_by(self.model.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        res = await self.session.stream(query)
+        rows = res if self.plain_rows else res.scalars()
+        async for chunk in rows.partitions(chunk_size):
+            yield list(chunk)
 
     async def update_one_by_id(self, obj_id: int, **kwargs: Any) -> model:
         query = update(self.model).filter(self.model.id == obj_id).values(**kwargs).returning(self.model)
@@ -84,7 +406,7 @@ class SqlAlchemyRepository(AbstractRepository):
         await self.session.execute(query)
 
     async def delete_by_query(self, **kwargs) -> None:
-        query = delete(self.model).filter_by(**kwargs)
+        query = delete(self.model).where(*self._filters(kwargs))
         await self.session.execute(query)
         await self.session.commit()
 
@@ -1,10 +1,15 @@
 from typing import Optional
 
-from sqlalchemy import select, delete, text, Sequence
+from sqlalchemy import Select, Update, select, delete, update, func, text, or_, Sequence
 from sqlalchemy_utils.types.ltree import Ltree
 
 from app.models.departments import DepartmentModel
 from app.repositories.base import SqlAlchemyRepository
+from app.repositories.filters import ltree_value
+
+
+class DepartmentNotFound(ValueError):
+    """Отдела нет или он принадлежит другой компании."""
 
 
 class DepartmentRepository(SqlAlchemyRepository):
@@ -32,52 +37,137 @@ class DepartmentRepository(SqlAlchemyRepository):
 
         return department.id
 
-    async def get_ancestors(self, department_id: int) -> list[DepartmentModel]:
-        department = await self.get_by_id(department_id)
-        if not department:
-            raise ValueError(f"Department not found")
-        query = select(self.model).where(self.model.path.op("@>")(department.path))
+    async def get_ancestors(self, department_id: int, company_id: int) -> list[DepartmentModel]:
+        query = select(self.model).where(
+            self.model.company_id == company_id,
+            self.model.path.op("@>")(self._path_of(department_id, company_id)),
+        )
         result = await self.session.execute(query)
         return result.scalars().all()
 
-    async def get_descendants(self, department_id: int) -> list[DepartmentModel]:
-        department = await self.get_by_id(department_id)
-        if not department:
-            raise ValueError(f"Department not found")
-        query = select(self.model).where(self.model.path.op("<@")(department.path))
+    async def get_descendants(self, department_id: int, company_id: int) -> list[DepartmentModel]:
+        query = select(self.model).where(
+            self.model.company_id == company_id,
+            self.model.path.op("<@")(self._path_of(department_id, company_id)),
+        )
         result = await self.session.execute(query)
         return result.scalars().all()
 
-    async def get_visualized_path(self, department_id: int) -> str:
-        department = await self.get_by_id(department_id)
-        if not department:
-            raise ValueError("Department not found")
-
-        path_ids = [int(part) for part in str(department.path).split(".")]
+    async def add_tree(
+        self,
+        nodes: Sequence[tuple[str, Optional[int]]],
+        company_id: int,
+        parent_id: Optional[int] = None,
+    ) -> list[int]:
+        """
+        Вставляет дерево отделов одним executemany.
+
+        `nodes` — пары (имя, индекс родителя в `nodes` или None), родитель идёт
+        раньше потомков. Узлы без родителя встают под `parent_id`. Возвращает
+        id в порядке `nodes`.
+        """
+        if not nodes:
+            return []
+        base_path = None
+        if parent_id is not None:
+            # FOR UPDATE: параллельный перенос не сменит путь родителя до вставки поддерева
+            query = (
+                select(self.model.path, self.model.company_id)
+                .where(self.model.id == parent_id)
+                .with_for_update()
+            )
+            parent = (await self.session.execute(query)).one_or_none()
+            if not parent or parent.company_id != company_id:
+                raise ValueError("Parent department not found")
+            if not parent.path:
+                raise ValueError("Parent path is not set")
+            base_path = str(parent.path)
+
+        # id берём из последовательности заранее — пути считаются в памяти, без flush на узел
+        query = select(
+            func.nextval(func.pg_get_serial_sequence(self.model.__tablename__, "id"))
+        ).select_from(func.generate_series(1, len(nodes)))
+        ids = list((await self.session.execute(query)).scalars())
+
+        paths: list[str] = []
+        for node_id, (_, parent_index) in zip(ids, nodes):
+            prefix = paths[parent_index] if parent_index is not None else base_path
+            paths.append(f"{prefix}.{node_id}" if prefix else str(node_id))
+
+        await self.add_many([
+            {"id": node_id, "name": name, "company_id": company_id, "path": Ltree(path)}
+            for node_id, (name, _), path in zip(ids, nodes, paths)
+        ])
+        return ids
+
+    # Все запросы по path ограничены company_id: пути разных компаний не пересекаются,
+    # а условие по компании идёт в составной GiST (company_id, path)
+    def _path_of(self, department_id: int, company_id: int):
+        return (
+            select(self.model.path)
+            .where(self.model.id == department_id, self.model.company_id == company_id)
+            .scalar_subquery()
+        )
 
-        query = select(self.model.id, self.model.name).where(self.model.id.in_(path_ids))
-        result = await self.session.execute(query)
-        id_name_map = {row.id: row.name for row in result.fetchall()}
+    @staticmethod
+    def _visualize(path: Ltree, names: dict[int, str]) -> str:
+        return ".".join(
+            names.get(int(part), f"<missing:{part}>") for part in str(path).split(".")
+        )
 
-        path_names = [id_name_map.get(dep_id, f"<missing:{dep_id}>") for dep_id in path_ids]
+    def _chain_query(self, department_id: int, company_id: int) -> Select:
+        return (
+            select(self.model.id, self.model.name, self.model.path)
+            .where(
+                self.model.company_id == company_id,
+                self.model.path.op("@>")(self._path_of(department_id, company_id)),
+            )
+            .order_by(self.model.path)
+        )
 
-        return ".".join(path_names)
+    def _subtree_query(self, department_id: int, company_id: int) -> Select:
+        # поддерево вместе с предками корня: имена для всех путей есть в одной выборке
+        root_path = self._path_of(department_id, company_id)
+        return (
+            select(self.model.id, self.model.name, self.model.path)
+            .where(
+                self.model.company_id == company_id,
+                or_(self.model.path.op("<@")(root_path), self.model.path.op("@>")(root_path)),
+            )
+            .order_by(self.model.path)
+        )
 
-    async def get_ancestors_with_names(self, department_id: int) -> list[str]:
-        ancestors = await self.get_ancestors(department_id)
-        result = []
-        for department in ancestors:
-            visualized_path = self.get_visualized_path(department.id)
-            result.append(visualized_path)
-        return result
+    async def _get_chain(self, department_id: int, company_id: int) -> list:
+        """Отдел и все его предки (от корня) одним запросом."""
+        rows = (await self.session.execute(self._chain_query(department_id, company_id))).all()
+        if not rows:
+            raise ValueError("Department not found")
+        return rows
+
+    async def get_visualized_path(self, department_id: int, company_id: int) -> str:
+        rows = await self._get_chain(department_id, company_id)
+        names = {row.id: row.name for row in rows}
+        return self._visualize(rows[-1].path, names)
+
+    async def get_ancestors_with_names(self, department_id: int, company_id: int) -> list[str]:
+        rows = await self._get_chain(department_id, company_id)
+        names = {row.id: row.name for row in rows}
+        return [self._visualize(row.path, names) for row in rows]
+
+    async def get_descendants_with_names(self, department_id: int, company_id: int) -> list[str]:
+        query = self._subtree_query(department_id, company_id)
+        rows = (await self.session.execute(query)).all()
+        names = {row.id: row.name for row in rows}
+        root = next((row for row in rows if row.id == department_id), None)
+        if root is None:
+            raise ValueError("Department not found")
 
-    async def get_descendants_with_names(self, department_id: int) -> list[str]:
-        descendants = await self.get_descendants(department_id)
-        result = []
-        for department in descendants:
-            visualized_path = self.get_visualized_path(department.id)
-            result.append(visualized_path)
-        return result
+        root_level = len(str(root.path).split("."))
+        return [
+            self._visualize(row.path, names)
+            for row in rows
+            if len(str(row.path).split(".")) >= root_level
+        ]
 
     async def move_department(self, department_id: int, new_parent_path: str):
         department = await self.get_by_id(department_id)
@@ -87,38 +177,66 @@ class DepartmentRepository(SqlAlchemyRepository):
         self.session.add(department)
         await self.session.commit()
 
-    async def move_department_with_descendants(self, department_id: int, new_parent_path: str):
-        department = await self.get_by_id(department_id)
+    async def move_department_with_descendants(
+        self, department_id: int, new_parent_id: int, company_id: int
+    ) -> int:
+        """
+        Переносит отдел со всем поддеревом под `new_parent_id` одним UPDATE.
+
+        Возвращает число изменённых строк. Отдел или родитель не из
+        `company_id` — DepartmentNotFound; перенос под самого себя или своего
+        потомка и отдел без пути — ValueError.
+        """
+        # FOR UPDATE: путь нового родителя не изменится параллельным переносом до нашего UPDATE
+        query = (
+            select(self.model.id, self.model.path)
+            .where(
+                self.model.id.in_([department_id, new_parent_id]),
+                self.model.company_id == company_id,
+            )
+            .with_for_update()
+        )
+        rows = {row.id: row for row in (await self.session.execute(query)).all()}
+        department, new_parent = rows.get(department_id), rows.get(new_parent_id)
         if not department:
-            raise ValueError("Department not found")
-
-        old_path = str(department.path)
-        new_path = f"{new_parent_path}.{department.id}"
-
-        department.path = Ltree(new_path)
-        self.session.add(department)
-
-        query = select(self.model).where(
-            self.model.path.op("<@")(old_path),
-            self.model.path != old_path
+            raise DepartmentNotFound("Department not found")
+        if not new_parent:
+            raise DepartmentNotFound("New parent department not found")
+        # str(None) записал бы во всё поддерево метку 'None'
+        if not department.path or not new_parent.path:
+            raise ValueError("Department path is not set")
+
+        old_path, parent_path = str(department.path), str(new_parent.path)
+        if parent_path == old_path or parent_path.startswith(f"{old_path}."):
+            raise ValueError("Cannot move a department under itself or its descendant")
+
+        query = self._move_query(old_path, parent_path, company_id)
+        result = await self.session.execute(query)
+        return result.rowcount
+
+    def _move_query(self, old_path: str, parent_path: str, company_id: int) -> Update:
+        # '1.2.7.9' при переносе 7 под '1.5' -> '1.5' || subpath('1.2.7.9', 2) = '1.5.7.9'
+        old_parent_level = len(old_path.split(".")) - 1
+        path_type = self.model.path.type
+        return (
+            update(self.model)
+            .where(*self._filters({"company_id": company_id, "path__descendant_of": old_path}))
+            .values(
+                path=ltree_value(self.model.path, parent_path).op("||", return_type=path_type)(
+                    func.subpath(self.model.path, old_parent_level)
+                )
+            )
+            # объекты поддерева в сессии не перечитываем: для 50k строк это лишняя выборка
+            .execution_options(synchronize_session=False)
         )
 
+    async def delete_by_query(self, department_id: int, company_id: int) -> int:
+        """Удаляет отдел с поддеревом; возвращает число удалённых строк."""
+        query = delete(self.model).where(
+            self.model.company_id == company_id,
+            self.model.path.op("<@")(self._path_of(department_id, company_id)),
+        )
         result = await self.session.execute(query)
-        descendants = result.scalars().all()
-
-        for descendant in descendants:
-            descendant_old_path = str(descendant.path)
-            relative_path = descendant_old_path[len(old_path) + 1:]
-            descendant.path = Ltree(f"{new_path}.{relative_path}")
-            self.session.add(descendant)
-
-        await self.session.commit()
-
-    async def delete_by_query(self, department_id: int):
-        department = await self.get_by_id(department_id)
-        if not department:
+        if not result.rowcount:
             raise ValueError("Department not found")
-
-        query = delete(self.model).where(self.model.path.op("<@")(department.path))
-        await self.session.execute(query)
-        await self.session.commit()
+        return result.rowcount
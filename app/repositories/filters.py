@@ -0,0 +1,61 @@
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any
+
+from sqlalchemy import Column, ColumnElement, Table, Text, UnaryExpression, cast, literal
+
+
+def ltree_value(column: Column, value: Any) -> ColumnElement:
+    """
+    Путь ltree как CAST(текст AS LTREE): у LtreeType bind- и literal-обработчики
+    ждут разные типы (Ltree и str), а текстовый параметр рендерится и с обычными
+    параметрами, и с literal_binds (EXPLAIN).
+    """
+    return cast(literal(str(value), Text()), column.type)
+
+
+# Фильтры задаются как `колонка__оператор=значение`, без оператора — равенство:
+#   get_by_query_all(company_id=1, id__in=[1, 2], deadline__lt=..., manager_id__isnull=True,
+#                    email__startswith="ivan", order_by=["-id"], limit=50)
+# Все условия собираются в один WHERE одного запроса.
+LOOKUPS: dict[str, Callable[[Column, Any], ColumnElement[bool]]] = {
+    "eq": lambda column, value: column == value,
+    "ne": lambda column, value: column != value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "in": lambda column, value: column.in_(value),
+    "not_in": lambda column, value: column.not_in(value),
+    "isnull": lambda column, value: column.is_(None) if value else column.is_not(None),
+    # LIKE 'prefix%' идёт по btree‑индексу только с text_pattern_ops или в локали C
+    "startswith": lambda column, value: column.startswith(value, autoescape=True),
+    # ltree: `path__descendant_of="1.2"` -> path <@ '1.2', `path__ancestor_of` -> path @> ...
+    "descendant_of": lambda column, value: column.op("<@")(ltree_value(column, value)),
+    "ancestor_of": lambda column, value: column.op("@>")(ltree_value(column, value)),
+}
+
+
+def _column(table: Table, name: str) -> Column:
+    try:
+        return table.c[name]
+    except KeyError:
+        raise ValueError(f"Unknown column {table.name}.{name}")
+
+
+def compile_filters(table: Table, filters: Mapping[str, Any]) -> list[ColumnElement[bool]]:
+    conditions = []
+    for key, value in filters.items():
+        name, _, lookup = key.partition("__")
+        operator = LOOKUPS.get(lookup or "eq")
+        if operator is None:
+            raise ValueError(f"Unknown lookup {lookup!r} in {key!r}")
+        conditions.append(operator(_column(table, name), value))
+    return conditions
+
+
+def compile_order_by(table: Table, fields: Sequence[str]) -> list[UnaryExpression]:
+    """`["-deadline", "id"]` -> ORDER BY deadline DESC, id ASC."""
+    return [
+        _column(table, field[1:]).desc() if field.startswith("-") else _column(table, field).asc()
+        for field in fields
+    ]
@@ -4,3 +4,7 @@ from app.repositories.base import SqlAlchemyRepository
 
 class TaskRepository(SqlAlchemyRepository):
     model = TaskModel
+    loading_profiles = {
+        # отдельные SELECT ... IN вместо JOIN: наблюдатели и исполнители не перемножаются
+        "participants": {"observers": "selectin", "executors": "selectin"},
+    }
@@ -1,47 +1,216 @@
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from typing import Optional
 
+from sqlalchemy import (
+    delete, exists, func, insert, literal, or_, select, text, true, union_all, update,
+)
+
+from app.models.user_hierarchy import UserHierarchyModel
 from app.models.users import UserModel
 from app.repositories.base import SqlAlchemyRepository
 
 
+# пространство ключей pg_advisory_xact_lock для смены руководителей (второй ключ — company_id)
+_HIERARCHY_LOCK_NAMESPACE = 7201
+
+# Полная пересборка замыкания: от каждого сотрудника вверх по цепочке руководителей.
+# Путь в CTE защищает от зацикливания, если в manager_id всё же оказался цикл.
+_REBUILD_HIERARCHY_SQL = """
+WITH RECURSIVE chain(ancestor_id, descendant_id, depth, path) AS (
+    SELECT manager_id, id, 1, ARRAY[id, manager_id]
+    FROM users
+    WHERE manager_id IS NOT NULL {company_filter}
+    UNION ALL
+    SELECT u.manager_id, chain.descendant_id, chain.depth + 1, chain.path || u.manager_id
+    FROM chain JOIN users u ON u.id = chain.ancestor_id
+    WHERE u.manager_id IS NOT NULL AND NOT u.manager_id = ANY(chain.path)
+)
+INSERT INTO user_hierarchy (ancestor_id, descendant_id, depth)
+SELECT ancestor_id, descendant_id, depth FROM chain
+"""
+
+
 class UserRepository(SqlAlchemyRepository):
     model = UserModel
+    loading_profiles = {
+        # many-to-one: JOIN не размножает строки
+        "org": {
+            "company": "joined",
+            "department": "joined",
+            "position": "joined",
+            "manager": "joined",
+        },
+        "subordinates": {"subordinates": "selectin"},
+    }
+
+    async def get_all_subordinates(
+        self,
+        user_id: int,
+        company_id: int,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> list[dict]:
+        """
+        Все подчинённые пользователя (прямые и косвенные) внутри компании.
+
+        Читается из таблицы‑замыкания по первичному ключу (ancestor_id, …):
+        один проход по индексу без рекурсии, `max_depth=1` — только прямые
+        подчинённые.
+        """
+        users = self.model.__table__
+        hierarchy = UserHierarchyModel.__table__
+
+        query = (
+            select(
+                users.c.id,
+                users.c.email,
+                users.c.first_name,
+                users.c.last_name,
+                users.c.manager_id,
+                users.c.department_id,
+                hierarchy.c.depth,
+            )
+            .join(hierarchy, users.c.id == hierarchy.c.descendant_id)
+            .where(hierarchy.c.ancestor_id == user_id, users.c.company_id == company_id)
+            .order_by(hierarchy.c.depth, users.c.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        if max_depth is not None:
+            query = query.where(hierarchy.c.depth <= max_depth)
+        result = await self.session.execute(query)
+        return [dict(row) for row in result.mappings()]
+
+    async def get_ancestor_ids(self, user_id: int, max_depth: Optional[int] = None) -> list[int]:
+        """Цепочка руководителей от непосредственного вверх (по таблице‑замыканию)."""
+        hierarchy = UserHierarchyModel.__table__
+        query = (
+            select(hierarchy.c.ancestor_id)
+            .where(hierarchy.c.descendant_id == user_id)
+            .order_by(hierarchy.c.depth)
+        )
+        if max_depth is not None:
+            query = query.where(hierarchy.c.depth <= max_depth)
+        result = await self.session.execute(query)
+        return list(result.scalars())
+
+    async def get_descendant_ids(self, user_id: int, max_depth: Optional[int] = None) -> list[int]:
+        hierarchy = UserHierarchyModel.__table__
+        query = (
+            select(hierarchy.c.descendant_id)
+            .where(hierarchy.c.ancestor_id == user_id)
+            .order_by(hierarchy.c.depth, hierarchy.c.descendant_id)
+        )
+        if max_depth is not None:
+            query = query.where(hierarchy.c.depth <= max_depth)
+        result = await self.session.execute(query)
+        return list(result.scalars())
 
-    async def get_all_subordinates(self, user_id: int) -> list[dict]:
-        # Загружаем всех пользователей, у которых есть менеджер
-        result = await self.session.execute(select(self.model))
-        all_users = result.scalars().all()
+    async def is_subordinate(self, user_id: int, manager_id: int) -> bool:
+        """Находится ли user_id где‑либо под manager_id — один поиск по первичному ключу."""
+        hierarchy = UserHierarchyModel.__table__
+        query = select(
+            exists().where(
+                hierarchy.c.ancestor_id == manager_id,
+                hierarchy.c.descendant_id == user_id,
+            )
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one()
 
-        # Создаем отображение: manager_id -> list of subordinates
-        manager_map = {}
-        for user in all_users:
-            if user.manager_id is not None:
-                manager_map.setdefault(user.manager_id, []).append(user)
+    async def set_manager(self, user_id: int, manager_id: Optional[int]) -> None:
+        """
+        Меняет руководителя и инкрементально обновляет замыкание: поддерево
+        user_id отцепляется от прежних руководителей и прицепляется ко всей
+        цепочке нового. Стоимость — размер поддерева × глубина новой цепочки.
+        """
+        users = self.model.__table__
+        hierarchy = UserHierarchyModel.__table__
 
-        # Найти корневого пользователя
-        root_user = next((u for u in all_users if u.id == user_id), None)
-        if not root_user:
+        user = await self.get_columns_by_id(user_id, ["company_id"])
+        if not user:
             raise ValueError("User not found")
 
-        # Рекурсивный обход иерархии
-        def collect_subordinates(user):
-            subordinates = manager_map.get(user.id, [])
-            result = []
-            for sub in subordinates:
-                result.append(sub)
-                result.extend(collect_subordinates(sub))
-            return result
-
-        subordinates = collect_subordinates(root_user)
-        return [self._serialize_user(user) for user in subordinates]
-
-    def _serialize_user(self, user: UserModel) -> dict:
-        return {
-            "id": user.id,
-            "email": user.email,
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "manager_id": user.manager_id,
-            "department_id": user.department_id,
-        }
+        # смены руководителей в компании идут по очереди — иначе две встречные
+        # смены могут пройти проверку на цикл одновременно
+        await self.session.execute(
+            select(func.pg_advisory_xact_lock(_HIERARCHY_LOCK_NAMESPACE, user.company_id))
+        )
+        # manager_id читается только под блокировкой: до неё его могла сменить
+        # параллельная транзакция, и поддерево отцепилось бы не от тех руководителей
+        current_manager_id = (await self.session.execute(
+            select(users.c.manager_id).where(users.c.id == user_id).with_for_update()
+        )).scalar_one()
+        if current_manager_id == manager_id:
+            return
+
+        if manager_id is not None:
+            if manager_id == user_id or await self.is_subordinate(manager_id, user_id):
+                raise ValueError("A user cannot report to themselves or to a subordinate")
+            if not await self.exists_by_query(id=manager_id, company_id=user.company_id):
+                raise ValueError("Manager not found")
+
+        subtree = or_(
+            hierarchy.c.descendant_id == user_id,
+            hierarchy.c.descendant_id.in_(
+                select(hierarchy.c.descendant_id).where(hierarchy.c.ancestor_id == user_id)
+            ),
+        )
+        old_ancestors = select(hierarchy.c.ancestor_id).where(hierarchy.c.descendant_id == user_id)
+        await self.session.execute(
+            delete(hierarchy).where(subtree, hierarchy.c.ancestor_id.in_(old_ancestors))
+        )
+
+        if manager_id is not None:
+            ancestors = union_all(
+                select(literal(manager_id).label("id"), literal(0).label("depth")),
+                select(hierarchy.c.ancestor_id, hierarchy.c.depth).where(
+                    hierarchy.c.descendant_id == manager_id
+                ),
+            ).subquery("ancestors")
+            descendants = union_all(
+                select(literal(user_id).label("id"), literal(0).label("depth")),
+                select(hierarchy.c.descendant_id, hierarchy.c.depth).where(
+                    hierarchy.c.ancestor_id == user_id
+                ),
+            ).subquery("descendants")
+            await self.session.execute(
+                insert(hierarchy).from_select(
+                    ["ancestor_id", "descendant_id", "depth"],
+                    select(
+                        ancestors.c.id,
+                        descendants.c.id,
+                        ancestors.c.depth + descendants.c.depth + 1,
+                    ).select_from(ancestors.join(descendants, true())),
+                )
+            )
+
+        await self.session.execute(
+            update(users).where(users.c.id == user_id).values(manager_id=manager_id)
+        )
+
+    async def rebuild_hierarchy(self, company_id: Optional[int] = None) -> int:
+        """Пересобирает замыкание по users.manager_id (всё или одной компании)."""
+        hierarchy = UserHierarchyModel.__table__
+        users = self.model.__table__
+
+        # чтения не блокируются, смены руководителей ждут окончания пересборки
+        await self.session.execute(text("LOCK TABLE user_hierarchy IN EXCLUSIVE MODE"))
+
+        query = delete(hierarchy)
+        company_filter = ""
+        params = {}
+        if company_id is not None:
+            query = query.where(
+                hierarchy.c.descendant_id.in_(
+                    select(users.c.id).where(users.c.company_id == company_id)
+                )
+            )
+            company_filter = "AND company_id = :company_id"
+            params["company_id"] = company_id
+        await self.session.execute(query)
+
+        result = await self.session.execute(
+            text(_REBUILD_HIERARCHY_SQL.format(company_filter=company_filter)), params
+        )
+        return result.rowcount
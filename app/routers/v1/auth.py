@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+
+from app.auth.rate_limit import throttle_sign_in
 
 from app.schemas.auth import (
     SignUpRequestSchema,
@@ -11,7 +13,7 @@ from app.schemas.auth import (
 from app.services.auth import AuthService
 
 
-auth_router = APIRouter(prefix="/v1/auth", tags=["Auth"])
+auth_router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
 @auth_router.post("/sign-up/", response_model=SignUpResponseSchema)
@@ -30,6 +32,13 @@ async def sign_up_complete(
 
 @auth_router.post("/sign-in", response_model=TokenInfo)
 async def sign_in(
-    schema: SignInRequestSchema, service: AuthService = Depends()
+    schema: SignInRequestSchema, request: Request, service: AuthService = Depends()
 ) -> TokenInfo:
+    # лимит проверяется до bcrypt — перебор паролей не должен занимать CPU воркеров.
+    # За прокси request.client.host берётся из X-Forwarded-For только при
+    # доверенном FORWARDED_ALLOW_IPS, иначе все клиенты делят лимит адреса прокси
+    await throttle_sign_in(
+        email=schema.email,
+        client_ip=request.client.host if request.client else None,
+    )
     return await service.sign_in(schema=schema)
@@ -1,15 +1,16 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends
 
 from app.auth.auth_utils import get_current_user
+from app.schemas.departments import DepartmentImportRequest
 from app.schemas.user import UserToken
 from app.services.department import DepartmentService
 
 from fastapi_cache.decorator import cache
 
 
-department_router = APIRouter(prefix="/v1/department", tags=["Department"])
+department_router = APIRouter(prefix="/department", tags=["Department"])
 
 
 @department_router.post("/")
@@ -27,6 +28,33 @@ async def create_department(
     )
 
 
+@department_router.post("/import")
+async def import_departments(
+    payload: DepartmentImportRequest,
+    current_user: UserToken = Depends(get_current_user),
+    service: DepartmentService = Depends(),
+):
+    return await service.import_department_tree(
+        payload.departments,
+        current_user=current_user,
+        parent_id=payload.parent_id,
+    )
+
+
+@department_router.post("/import/csv")
+async def import_departments_csv(
+    data: str = Body(..., media_type="text/csv"),
+    parent_id: Optional[int] = None,
+    current_user: UserToken = Depends(get_current_user),
+    service: DepartmentService = Depends(),
+):
+    return await service.import_department_csv(
+        data,
+        current_user=current_user,
+        parent_id=parent_id,
+    )
+
+
 @cache(expire=100)
 @department_router.get("/{department_id}/descendants")
 async def get_descendants(
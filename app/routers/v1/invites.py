@@ -10,7 +10,7 @@ from app.schemas.user import (
 from app.services.invite import InviteService
 
 
-invite_router = APIRouter(prefix="/v1/invites", tags=["Invites"])
+invite_router = APIRouter(prefix="/invites", tags=["Invites"])
 
 
 @invite_router.get("/check_account/{account}", response_model=CheckAccountResponse)
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.auth.auth_utils import get_current_user, verified_token_cache
+from app.auth.password_pool import password_pool
+from app.database import pool_stats
+from app.schemas.auth import UserToken
+
+
+metrics_router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@metrics_router.get("/")
+async def get_metrics(
+    current_user: UserToken = Depends(get_current_user),
+) -> dict:
+    """Метрики текущего воркера: пул соединений с БД, пул bcrypt, кэш JWT."""
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Permission denied")
+    return {
+        "db_pool": pool_stats(),
+        "password_pool": password_pool.stats(),
+        "jwt_cache": verified_token_cache.stats(),
+    }
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from fastapi_cache.decorator import cache
 
 from app.auth.auth_utils import get_current_user
@@ -8,7 +8,7 @@ from app.schemas.user import UserToken
 from app.services.position import PositionService
 
 
-positions_router = APIRouter(prefix="/v1/positions", tags=["Positions"])
+positions_router = APIRouter(prefix="/positions", tags=["Positions"])
 
 
 @positions_router.post("/")
@@ -86,10 +86,16 @@ async def assign_position_to_user(
 @positions_router.get("/{user_id}/subordinates/")
 async def get_subordinates(
     user_id: int,
+    max_depth: Optional[int] = Query(None, ge=1),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
     service: PositionService = Depends(),
     current_user: UserToken = Depends(get_current_user),
 ):
     return await service.get_subordinates(
         user_id=user_id,
-        current_user=current_user
+        current_user=current_user,
+        max_depth=max_depth,
+        limit=limit,
+        offset=offset,
     )
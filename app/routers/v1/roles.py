@@ -5,7 +5,7 @@ from app.auth.auth_utils import get_current_user
 from app.schemas.user import UserToken
 from app.services.role import RoleService
 
-roles_router = APIRouter(prefix="/v1/roles", tags=["Roles"])
+roles_router = APIRouter(prefix="/roles", tags=["Roles"])
 
 
 @roles_router.post("/{user_id}/assign-role/")
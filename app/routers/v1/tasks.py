@@ -5,18 +5,16 @@ from app.auth.auth_utils import get_current_user
 from app.schemas.auth import UserToken
 from app.schemas.tasks import TaskCreate, TaskUpdate
 from app.services.task import TaskService
-from app.uow.unit_of_work import UnitOfWork, get_uow
 
-tasks_router = APIRouter(prefix="/v1/tasks", tags=["Tasks"])
+tasks_router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
 
 @tasks_router.post("/")
 async def create_task(
     task_data: TaskCreate,
     current_user: UserToken = Depends(get_current_user),
-    uow: UnitOfWork = Depends(get_uow),
+    service: TaskService = Depends(),
 ):
-    service = TaskService(uow)
     try:
         task = await service.create_task(
             title=task_data.title,
@@ -38,9 +36,8 @@ async def create_task(
 async def get_task(
     task_id: int,
     current_user: UserToken = Depends(get_current_user),
-    uow: UnitOfWork = Depends(get_uow),
+    service: TaskService = Depends(),
 ):
-    service = TaskService(uow)
     try:
         return await service.get_task(task_id)
     except ValueError as e:
@@ -52,9 +49,8 @@ async def update_task(
     task_id: int,
     updates: TaskUpdate,
     current_user: UserToken = Depends(get_current_user),
-    uow: UnitOfWork = Depends(get_uow),
+    service: TaskService = Depends(),
 ):
-    service = TaskService(uow)
     try:
         return await service.update_task(task_id, updates.model_dump(exclude_unset=True))
     except ValueError as e:
@@ -65,9 +61,8 @@ async def update_task(
 async def delete_task(
     task_id: int,
     current_user: UserToken = Depends(get_current_user),
-    uow: UnitOfWork = Depends(get_uow),
+    service: TaskService = Depends(),
 ):
-    service = TaskService(uow)
     try:
         await service.delete_task(task_id)
         return {"detail": "Task deleted"}
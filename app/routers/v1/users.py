@@ -1,6 +1,6 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from pydantic import EmailStr
 
 from app.schemas.user import UserToken, UserUpdateRequest
@@ -9,7 +9,21 @@ from app.auth.auth_utils import get_current_user
 from app.services.user import UserService
 
 
-user_router = APIRouter(prefix="/v1/user", tags=["Users"])
+user_router = APIRouter(prefix="/user", tags=["Users"])
+
+
+@user_router.get("/")
+async def list_employees(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    service: UserService = Depends(),
+    current_user: UserToken = Depends(get_current_user),
+) -> dict:
+    return await service.list_employees(
+        current_user=current_user,
+        cursor=cursor,
+        limit=limit,
+    )
 
 
 @user_router.post("/create-employee")
@@ -57,3 +71,15 @@ async def update_email(
         new_email=new_email,
         current_user=current_user
     )
+
+
+@user_router.post("/{user_id}/revoke-tokens")
+async def revoke_tokens(
+    user_id: int,
+    service: UserService = Depends(),
+    current_user: UserToken = Depends(get_current_user)
+) -> dict:
+    return await service.revoke_tokens(
+        user_id=user_id,
+        current_user=current_user
+    )
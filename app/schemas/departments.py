@@ -23,4 +23,14 @@ class DepartmentResponse(BaseModel):
     company_id: int
     path: str
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class DepartmentImportNode(BaseModel):
+    name: str
+    children: list["DepartmentImportNode"] = []
+
+
+class DepartmentImportRequest(BaseModel):
+    # корни дерева встают под этот отдел; без него — на верхний уровень компании
+    parent_id: Optional[int] = None
+    departments: list[DepartmentImportNode]
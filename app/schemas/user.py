@@ -74,3 +74,5 @@ class UserUpdateRequest(BaseModel):
     last_name: Optional[str] = None
     email: Optional[EmailStr] = None
     position_id: Optional[int] = None
+    # null — снять руководителя; поле не передано — не менять
+    manager_id: Optional[int] = None
@@ -2,7 +2,7 @@ from datetime import datetime, timezone
 
 from fastapi import HTTPException
 
-from app.auth.auth_utils import hash_password, encode_jwt, validate_password
+from app.auth.auth_utils import encode_jwt, hash_password_async, validate_password_async
 from app.schemas.auth import (
     SignUpRequestSchema,
     SignUpResponseSchema,
@@ -43,16 +43,13 @@ class AuthService(BaseService):
                 detail="Account not verified.",
             )
 
-        company_exists = await self.uow.company.get_by_query_one_or_none(
-            name=schema.company_name
-        )
-        if company_exists:
+        if await self.uow.company.exists_by_query(name=schema.company_name):
             raise HTTPException(
                 status_code=400,
                 detail="Company name already in use.",
             )
 
-        hashed_password = hash_password(schema.password)
+        hashed_password = await hash_password_async(schema.password)
         company_id = await self.uow.company.add_one_and_get_id(name=schema.company_name)
         user_data = {
             "email": schema.email,
@@ -100,7 +97,7 @@ class AuthService(BaseService):
                 status_code=400,
                 detail="User with this email does not exist.",
             )
-        if not validate_password(
+        if not await validate_password_async(
                 password=password,
                 hashed_password=user.hashed_password,
         ):
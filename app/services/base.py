@@ -1,8 +1,10 @@
-from app.uow.unit_of_work import UnitOfWork
+from fastapi import Depends
+
+from app.uow.unit_of_work import UnitOfWork, get_uow
 
 
 class BaseService:
     base_repository: str
 
-    def __init__(self) -> None:
-        self.uow: UnitOfWork = UnitOfWork()
+    def __init__(self, uow: UnitOfWork = Depends(get_uow)) -> None:
+        self.uow: UnitOfWork = uow
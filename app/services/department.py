@@ -1,12 +1,104 @@
+import csv
+import io
+from collections import defaultdict, deque
 from typing import Optional
 
 from fastapi import HTTPException
-from sqlalchemy_utils import Ltree
 
+from app.repositories.department import DepartmentNotFound
+from app.schemas.departments import DepartmentImportNode
 from app.schemas.user import UserToken
 from app.services.base import BaseService
 from app.uow.unit_of_work import transaction_mode
 
+IMPORT_MAX_NODES = 10_000
+
+# (место узла во входных данных, ссылка, имя, ссылка на родителя)
+ImportRow = tuple[str, str, str, Optional[str]]
+
+
+def _flatten_tree(departments: list[DepartmentImportNode]) -> list[ImportRow]:
+    rows = []
+    stack = [(f"departments[{i}]", node, None) for i, node in enumerate(departments)][::-1]
+    while stack:
+        location, node, parent = stack.pop()
+        rows.append((location, location, node.name, parent))
+        stack.extend(
+            (f"{location}.children[{i}]", child, location)
+            for i, child in reversed(list(enumerate(node.children)))
+        )
+    return rows
+
+
+def _parse_csv(data: str) -> list[ImportRow]:
+    """CSV с заголовком `ref,name,parent_ref`; пустой parent_ref — корень."""
+    reader = csv.DictReader(io.StringIO(data))
+    return [
+        (
+            f"line {reader.line_num}",
+            (record.get("ref") or "").strip(),
+            (record.get("name") or "").strip(),
+            (record.get("parent_ref") or "").strip() or None,
+        )
+        for record in reader
+    ]
+
+
+def _order_import_rows(
+    rows: list[ImportRow],
+) -> tuple[list[tuple[str, Optional[int]]], list[str], list[dict]]:
+    """
+    Проверяет узлы и упорядочивает их от корней к листьям.
+
+    Возвращает пары (имя, индекс родителя) для DepartmentRepository.add_tree,
+    ссылки в том же порядке и ошибки по узлам.
+    """
+    if not rows:
+        return [], [], [{"node": None, "error": "Nothing to import"}]
+    if len(rows) > IMPORT_MAX_NODES:
+        return [], [], [{"node": None, "error": f"Too many departments, max {IMPORT_MAX_NODES}"}]
+
+    errors = []
+    by_ref: dict[str, ImportRow] = {}
+    for row in rows:
+        location, ref, name, _ = row
+        if not ref:
+            errors.append({"node": location, "error": "ref is required"})
+        elif ref in by_ref:
+            errors.append({"node": location, "error": f"Duplicate ref {ref!r}"})
+        else:
+            by_ref[ref] = row
+        if not name.strip():
+            errors.append({"node": location, "error": "name is required"})
+
+    children = defaultdict(list)
+    roots = []
+    for location, ref, _, parent in by_ref.values():
+        if parent is None:
+            roots.append(ref)
+        elif parent not in by_ref:
+            errors.append({"node": location, "error": f"Unknown parent_ref {parent!r}"})
+        else:
+            children[parent].append(ref)
+
+    nodes, refs, index = [], [], {}
+    queue = deque(roots)
+    while queue:
+        ref = queue.popleft()
+        parent = by_ref[ref][3]
+        index[ref] = len(nodes)
+        nodes.append((by_ref[ref][2].strip(), index[parent] if parent is not None else None))
+        refs.append(ref)
+        queue.extend(children[ref])
+
+    # узел с известным родителем не дошёл от корней: цикл или ошибка выше по цепочке
+    errors.extend(
+        {"node": location, "error": "Not reachable from a root (cycle in parent_ref?)"}
+        for location, ref, _, parent in by_ref.values()
+        if ref not in index and parent in by_ref
+    )
+    return nodes, refs, errors
+
 
 class DepartmentService(BaseService):
     @transaction_mode
@@ -23,7 +115,7 @@ class DepartmentService(BaseService):
         department_id = await self.uow.department.add_one(
             name=name, company_id=company_id, parent_id=parent_id
         )
-        visualized_path = await self.uow.department.get_visualized_path(department_id)
+        visualized_path = await self.uow.department.get_visualized_path(department_id, company_id)
 
         return {
             "message": "Department created successfully",
@@ -31,7 +123,7 @@ class DepartmentService(BaseService):
             "visualized_path": visualized_path,
         }
 
-    @transaction_mode
+    @transaction_mode(read_only=True)
     async def get_descendants(
             self,
             department_id: int,
@@ -39,10 +131,14 @@ class DepartmentService(BaseService):
     ) -> list:
         if not current_user.is_admin:
             raise HTTPException(status_code=403, detail="Permission denied")
-        descendants = await self.uow.department.get_descendants_with_names(department_id)
-        return descendants
+        try:
+            return await self.uow.department.get_descendants_with_names(
+                department_id, current_user.company_id
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
 
-    @transaction_mode
+    @transaction_mode(read_only=True)
     async def get_ancestors(
             self,
             department_id: int,
@@ -50,8 +146,12 @@ class DepartmentService(BaseService):
     ) -> list:
         if not current_user.is_admin:
             raise HTTPException(status_code=403, detail="Permission denied")
-        ancestors = await self.uow.department.get_ancestors_with_names(department_id)
-        return ancestors
+        try:
+            return await self.uow.department.get_ancestors_with_names(
+                department_id, current_user.company_id
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
 
     @transaction_mode
     async def move_department(
@@ -62,20 +162,23 @@ class DepartmentService(BaseService):
     ) -> dict:
         if not current_user.is_admin:
             raise HTTPException(status_code=403, detail="Permission denied")
-        new_parent = await self.uow.department.get_by_id(new_parent_id)
-        if not new_parent:
-            raise HTTPException(
-                status_code=404, detail="New parent department not found"
-            )
 
-        await self.uow.department.move_department_with_descendants(
-            department_id, new_parent.path
+        try:
+            moved = await self.uow.department.move_department_with_descendants(
+                department_id, new_parent_id, current_user.company_id
+            )
+        except DepartmentNotFound as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        visualized_path = await self.uow.department.get_visualized_path(
+            department_id, current_user.company_id
         )
-        visualized_path = await self.uow.department.get_visualized_path(department_id)
 
         return {
             "message": "Department moved successfully",
             "new_visualized_path": visualized_path,
+            "moved_departments": moved,
         }
 
     @transaction_mode
@@ -90,37 +193,25 @@ class DepartmentService(BaseService):
             raise HTTPException(status_code=403, detail="Permission denied")
 
         department = await self.uow.department.get_by_id(department_id)
-        if not department:
+        if not department or department.company_id != current_user.company_id:
             raise HTTPException(status_code=404, detail="Department not found")
 
         updates = {}
         if name is not None:
             updates["name"] = name
 
-        old_path = department.path
-
         if parent_id is not None:
-            new_parent = await self.uow.department.get_by_id(parent_id)
-            if not new_parent:
-                raise HTTPException(status_code=404, detail="New parent department not found")
-            if not new_parent.path:
-                raise HTTPException(status_code=400, detail="New parent path is not set")
-
-            new_path = f"{new_parent.path}.{department.id}"
-            updates["path"] = new_path
-
-            department.path = Ltree(new_path)
-            self.uow.department.session.add(department)
-
-            descendants = await self.uow.department.get_descendants(department_id)
-            for descendant in descendants:
-                relative_path = descendant.path[len(old_path) + 1:]
-                descendant.path = Ltree(f"{new_path}.{relative_path}")
-                self.uow.department.session.add(descendant)
+            try:
+                await self.uow.department.move_department_with_descendants(
+                    department_id, parent_id, current_user.company_id
+                )
+            except DepartmentNotFound as e:
+                raise HTTPException(status_code=404, detail=str(e))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
 
         if updates:
             await self.uow.department.update_one_by_id(obj_id=department_id, **updates)
-        await self.uow.department.session.commit()
         return {"message": "Department updated successfully."}
 
     @transaction_mode
@@ -132,11 +223,10 @@ class DepartmentService(BaseService):
         if not current_user.is_admin:
             raise HTTPException(status_code=403, detail="Permission denied")
 
-        department = await self.uow.department.get_by_id(department_id)
-        if not department:
-            raise HTTPException(status_code=404, detail="Department not found")
-
-        await self.uow.department.delete_by_query(department_id=department_id)
+        try:
+            await self.uow.department.delete_by_query(department_id, current_user.company_id)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
         return {"message": "Department deleted successfully"}
 
     @transaction_mode
@@ -154,3 +244,47 @@ class DepartmentService(BaseService):
 
         await self.uow.department.update_one_by_id(department_id, manager_id=user_id)
         return {"message": "Manager assigned successfully"}
+
+    async def import_department_tree(
+            self,
+            departments: list[DepartmentImportNode],
+            current_user: UserToken,
+            parent_id: Optional[int] = None,
+    ) -> dict:
+        return await self.import_departments(_flatten_tree(departments), current_user, parent_id)
+
+    async def import_department_csv(
+            self,
+            data: str,
+            current_user: UserToken,
+            parent_id: Optional[int] = None,
+    ) -> dict:
+        return await self.import_departments(_parse_csv(data), current_user, parent_id)
+
+    @transaction_mode
+    async def import_departments(
+            self,
+            rows: list[ImportRow],
+            current_user: UserToken,
+            parent_id: Optional[int] = None,
+    ) -> dict:
+        """Всё дерево — в одной транзакции; при любой ошибке узла ничего не создаётся."""
+        if not current_user.is_admin:
+            raise HTTPException(status_code=403, detail="Permission denied")
+
+        nodes, refs, errors = _order_import_rows(rows)
+        if errors:
+            raise HTTPException(status_code=422, detail=errors)
+
+        try:
+            ids = await self.uow.department.add_tree(
+                nodes, company_id=current_user.company_id, parent_id=parent_id
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return {
+            "message": "Departments imported successfully",
+            "created": len(ids),
+            "departments": dict(zip(refs, ids)),
+        }
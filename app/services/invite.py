@@ -1,13 +1,14 @@
 import secrets
 import uuid
 from datetime import datetime, timedelta, timezone
+from functools import partial
 
-import anyio
 import bcrypt
 from fastapi import Depends, HTTPException
 from pydantic import EmailStr
 
-from app.auth.auth_utils import generate_invite_token, hash_password
+from app.auth.auth_utils import generate_invite_token, hash_password_async
+from app.auth.user_status_cache import user_status_cache
 from app.config import settings
 from app.schemas.user import (
     CheckAccountResponse,
@@ -27,11 +28,12 @@ class InviteService(BaseService):
 
     @transaction_mode
     async def check_account(self, account_email: EmailStr) -> CheckAccountResponse:
-        existing_user = await self.uow.user.get_by_query_one_or_none(email=account_email)
-        if existing_user:
+        if await self.uow.user.exists_by_query(email=account_email):
             raise HTTPException(status_code=400, detail="Email already in use.")
 
-        company = await self.uow.company.get_by_query_one_or_none(name=DEFAULT_COMPANY_NAME)
+        company = await self.uow.company.get_columns_by_query_one_or_none(
+            ["id"], name=DEFAULT_COMPANY_NAME
+        )
         if not company:
             company_id = await self.uow.company.add_one_and_get_id(name=DEFAULT_COMPANY_NAME)
         else:
@@ -108,19 +110,18 @@ class InviteService(BaseService):
         if not secrets.compare_digest(invite.token, schema.token):
             raise HTTPException(status_code=400, detail="Invalid invite token.")
 
-        user = await self.uow.user.get_by_query_one_or_none(email=schema.email)
+        user = await self.uow.user.get_columns_by_query_one_or_none(["id"], email=schema.email)
         if not user:
             raise HTTPException(status_code=404, detail="User not found.")
 
-        hashed_password = await anyio.to_thread.run_sync(
-            hash_password, schema.password
-        )
+        hashed_password = await hash_password_async(schema.password)
 
         await self.uow.user.update_one_by_id(
             obj_id=user.id,
             hashed_password=hashed_password,
             is_active=True,
         )
+        self.uow.after_commit(partial(user_status_cache.publish_invalidation, user.id))
         await self.uow.invite.update_one_by_id(obj_id=invite.id, is_verified=True)
 
         return ConfirmRegistrationResponse(
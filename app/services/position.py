@@ -107,13 +107,28 @@ class PositionService(BaseService):
 
         return {"message": "Position assigned to user successfully"}
 
-    @transaction_mode
+    @transaction_mode(read_only=True)
     async def get_subordinates(
             self,
             user_id: int,
             current_user: UserToken,
+            max_depth: Optional[int] = None,
+            limit: Optional[int] = None,
+            offset: int = 0,
     ) -> list:
-        if not current_user.is_admin and current_user.user_id != user_id:
+        # руководитель видит подчинённых любого сотрудника из своего поддерева
+        if (
+            not current_user.is_admin
+            and current_user.user_id != user_id
+            and not await self.uow.user.is_subordinate(user_id, current_user.user_id)
+        ):
             raise HTTPException(status_code=403, detail="Permission denied")
-        subordinates = await self.uow.user.get_all_subordinates(user_id)
-        return [sub.dict() for sub in subordinates]
+        if not await self.uow.user.exists_by_query(id=user_id, company_id=current_user.company_id):
+            raise HTTPException(status_code=404, detail="User not found")
+        return await self.uow.user.get_all_subordinates(
+            user_id,
+            company_id=current_user.company_id,
+            max_depth=max_depth,
+            limit=limit,
+            offset=offset,
+        )
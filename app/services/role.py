@@ -27,13 +27,18 @@ class RoleService(BaseService):
         )
         return {"message": "Role assigned successfully."}
 
-    @transaction_mode
+    @transaction_mode(read_only=True, plain_rows=True)
     async def get_roles(
             self,
             user_id: int,
             current_user: UserToken,
     ) -> list:
-        if not current_user.is_admin and current_user.user_id != user_id:
+        # руководитель видит роли своих подчинённых (любого уровня)
+        if (
+            not current_user.is_admin
+            and current_user.user_id != user_id
+            and not await self.uow.user.is_subordinate(user_id, current_user.user_id)
+        ):
             raise HTTPException(status_code=403, detail="Permission denied")
         roles = await self.uow.role_assignment.get_by_query_all(user_id=user_id)
         return [
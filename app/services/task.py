@@ -1,13 +1,10 @@
 from typing import Optional
 from app.models.tasks import TaskStatus
 from app.services.base import BaseService
-from app.uow.unit_of_work import UnitOfWork, transaction_mode
+from app.uow.unit_of_work import transaction_mode
 
 
 class TaskService(BaseService):
-    def __init__(self, uow: UnitOfWork):
-        self.uow = uow
-
     @transaction_mode
     async def create_task(
         self,
@@ -32,31 +29,29 @@ class TaskService(BaseService):
             status=status,
         )
 
-        observers = []
-        for id in observer_ids:
-            user = await self.uow.user.get_by_id(id)
-            if not user:
-                raise ValueError(f"Observer with ID {id} not found")
-            observers.append(user)
-
-        executors = []
-        for id in executor_ids:
-            user = await self.uow.user.get_by_id(id)
-            if not user:
-                raise ValueError(f"Executor with ID {id} not found")
-            executors.append(user)
+        # наблюдатели и исполнители — одним запросом, в порядке переданных id
+        users = await self.uow.user.get_by_ids(observer_ids + executor_ids)
+        observers = users[:len(observer_ids)]
+        executors = users[len(observer_ids):]
+        for role, ids, found in (
+            ("Observer", observer_ids, observers),
+            ("Executor", executor_ids, executors),
+        ):
+            for id, user in zip(ids, found):
+                if not user:
+                    raise ValueError(f"{role} with ID {id} not found")
         if status not in TaskStatus._value2member_map_:
             raise ValueError(f"Invalid status: {status}")
 
-        task = await self.uow.task.get_by_id(task_id)
+        task = await self.uow.task.get_by_id(task_id, profile="participants")
         task.observers = observers
         task.executors = executors
         print(f"Received status: {status}")
         return task
 
-    @transaction_mode
+    @transaction_mode(read_only=True)
     async def get_task(self, task_id: int):
-        task = await self.uow.task.get_by_id(task_id)
+        task = await self.uow.task.get_by_id(task_id, profile="participants")
         if not task:
             raise ValueError("Task not found")
         return task
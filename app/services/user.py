@@ -1,13 +1,24 @@
+from functools import partial
 from typing import Optional
 
 from fastapi import HTTPException
 from pydantic import EmailStr
+from redis.exceptions import RedisError
 
 from app.schemas.user import UserUpdateRequest
 from app.schemas.auth import UserToken
 from app.services.base import BaseService
 from app.uow.unit_of_work import transaction_mode
-from app.auth.auth_utils import generate_invite_token, hash_password
+from app.auth.auth_utils import generate_invite_token, hash_password_async
+from app.auth.revocation import RevocationStoreUnavailable, token_revocations
+from app.auth.user_status_cache import user_status_cache
+
+
+# hashed_password и прочие служебные колонки в список не попадают
+EMPLOYEE_LIST_FIELDS = (
+    "id", "email", "first_name", "last_name", "is_active", "is_admin",
+    "department_id", "position_id", "manager_id",
+)
 
 
 class UserService(BaseService):
@@ -22,17 +33,18 @@ class UserService(BaseService):
             current_user: UserToken,
             position_id: Optional[int] = None,
     ) -> dict:
-        user_exists = await self.uow.user.get_by_query_one_or_none(email=email)
-        if user_exists:
+        if await self.uow.user.exists_by_query(email=email):
             raise HTTPException(status_code=400, detail="User already exists.")
 
-        invite_exists = await self.uow.invite.get_by_query_one_or_none(email=email)
+        invite_exists = await self.uow.invite.get_columns_by_query_one_or_none(
+            ["is_verified"], email=email
+        )
         if invite_exists and invite_exists.is_verified:
             raise HTTPException(status_code=400, detail="Invite already verified.")
 
         invite_token = generate_invite_token()
 
-        temp_password = hash_password("temporary_password")
+        temp_password = await hash_password_async("temporary_password")
 
         await self.uow.user.add_one(
             email=email,
@@ -54,6 +66,30 @@ class UserService(BaseService):
             "invite_token": invite_token,
         }
 
+    @transaction_mode(read_only=True, plain_rows=True)
+    async def list_employees(
+        self,
+        current_user: UserToken,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> dict:
+        """Сотрудники компании по id, keyset‑страницами: `next_cursor` — в следующий запрос."""
+        if not current_user.is_admin:
+            raise HTTPException(status_code=403, detail="Permission denied.")
+        try:
+            page = await self.uow.user.get_page(
+                cursor=cursor, limit=limit, company_id=current_user.company_id
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {
+            "items": [
+                {field: getattr(user, field) for field in EMPLOYEE_LIST_FIELDS}
+                for user in page.items
+            ],
+            "next_cursor": page.next_cursor,
+        }
+
     @transaction_mode
     async def update_user(
         self,
@@ -61,8 +97,8 @@ class UserService(BaseService):
         schema: UserUpdateRequest,
         current_user: UserToken,
     ) -> dict:
-        user = await self.uow.user.get_by_query_one_or_none(id=user_id)
-        if not user:
+        # админ правит только сотрудников своей компании (в том числе их руководителей)
+        if not await self.uow.user.exists_by_query(id=user_id, company_id=current_user.company_id):
             raise HTTPException(status_code=404, detail="User not found.")
         if user_id != current_user.user_id and not current_user.is_admin:
             raise HTTPException(status_code=403, detail="Permission denied.")
@@ -70,11 +106,23 @@ class UserService(BaseService):
         updates.pop("position_id", None)
         if not updates:
             raise HTTPException(status_code=400, detail="No fields to update.")
+        updated_fields = list(updates.keys())
+
+        if "manager_id" in updates:
+            if not current_user.is_admin:
+                raise HTTPException(status_code=403, detail="Permission denied.")
+            # manager_id меняется только вместе с таблицей‑замыканием иерархии
+            try:
+                await self.uow.user.set_manager(user_id, updates.pop("manager_id"))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
 
-        await self.uow.user.update_one_by_id(obj_id=user_id, **updates)
+        if updates:
+            await self.uow.user.update_one_by_id(obj_id=user_id, **updates)
+        self.uow.after_commit(partial(user_status_cache.publish_invalidation, user_id))
         return {
             "message": "User updated successfully.",
-            "updated_fields": list(updates.keys()),
+            "updated_fields": updated_fields,
         }
 
     @transaction_mode
@@ -84,11 +132,30 @@ class UserService(BaseService):
         new_email: EmailStr,
         current_user: UserToken,
     ) -> dict:
-        existing_user = await self.uow.user.get_by_query_one_or_none(email=new_email)
-        if existing_user:
+        if await self.uow.user.exists_by_query(email=new_email):
             raise HTTPException(status_code=400, detail="Email already in use.")
         if user_id != current_user.user_id and not current_user.is_admin:
             raise HTTPException(status_code=403, detail="Permission denied.")
 
         await self.uow.user.update_one_by_id(obj_id=user_id, email=new_email)
         return {"message": "Email updated successfully."}
+
+    @transaction_mode
+    async def revoke_tokens(
+        self,
+        user_id: int,
+        current_user: UserToken,
+    ) -> dict:
+        if user_id != current_user.user_id and not current_user.is_admin:
+            raise HTTPException(status_code=403, detail="Permission denied.")
+        # админ отзывает токены только сотрудников своей компании
+        if not await self.uow.user.exists_by_query(
+            id=user_id, company_id=current_user.company_id
+        ):
+            raise HTTPException(status_code=404, detail="User not found.")
+
+        try:
+            await token_revocations.revoke_user(user_id)
+        except (RevocationStoreUnavailable, RedisError):
+            raise HTTPException(status_code=503, detail="Token revocation is unavailable.")
+        return {"message": "All active tokens of the user have been revoked."}
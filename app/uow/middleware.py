@@ -0,0 +1,34 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.uow.unit_of_work import UnitOfWork
+
+
+class RequestUnitOfWorkMiddleware:
+    """
+    Создаёт один UnitOfWork на HTTP‑запрос и кладёт его в `request.state.uow`.
+
+    Аутентификация и сервисы (через `get_uow`) работают с ним, поэтому весь
+    запрос обходится одним соединением из пула. Соединение возвращается
+    в пул, как только начинается отправка ответа.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        uow = UnitOfWork(request_scoped=True)
+        scope.setdefault("state", {})["uow"] = uow
+
+        async def send_releasing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                await uow.release()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_releasing)
+        finally:
+            await uow.release()
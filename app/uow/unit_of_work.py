@@ -1,9 +1,17 @@
 import functools
+import logging
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
 from types import TracebackType
 from typing import Any, NoReturn, Optional, Callable, Awaitable
 
-from app.database import async_session_maker
+from sqlalchemy.exc import SQLAlchemyError
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, AsyncSessionTransaction
+
+from app.config import settings
+from app.database import async_session_maker, engine, next_replica_session_maker
+from app.repositories.base import SqlAlchemyRepository
 from app.repositories.company import CompanyRepository
 from app.repositories.department import DepartmentRepository
 from app.repositories.invite import InviteRepository
@@ -13,6 +21,17 @@ from app.repositories.task import TaskRepository
 from app.repositories.user import UserRepository
 
 
+logger = logging.getLogger(__name__)
+
+# Выставляется после записи: оставшиеся read-only транзакции запроса идут на основную БД
+_pinned_to_primary: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+
+
+def pin_to_primary() -> None:
+    """Направляет все последующие транзакции текущего запроса на основную БД."""
+    _pinned_to_primary.set(True)
+
+
 class AbstractUnitOfWork(ABC):
 
     user: UserRepository
@@ -43,20 +62,71 @@ class AbstractUnitOfWork(ABC):
         raise NotImplementedError
 
 
+class _LazyRepository:
+    """Репозиторий создаётся при первом обращении и живёт до конца транзакции."""
+
+    def __init__(self, repository_class: type[SqlAlchemyRepository]) -> None:
+        self.repository_class = repository_class
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, uow: Optional["UnitOfWork"], owner: type) -> Any:
+        if uow is None:
+            return self
+        repository = self.repository_class(uow.session, plain_rows=uow.plain_rows)
+        # кладём в __dict__ экземпляра — следующие обращения идут мимо дескриптора
+        uow.__dict__[self.name] = repository
+        return repository
+
+
 class UnitOfWork(AbstractUnitOfWork):
 
-    def __init__(self) -> None:
+    user = _LazyRepository(UserRepository)
+    company = _LazyRepository(CompanyRepository)
+    position = _LazyRepository(PositionRepository)
+    invite = _LazyRepository(InviteRepository)
+    department = _LazyRepository(DepartmentRepository)
+    role_assignment = _LazyRepository(RoleAssignmentRepository)
+    task = _LazyRepository(TaskRepository)
+
+    _REPOSITORIES = (
+        "user", "company", "position", "invite", "department", "role_assignment", "task",
+    )
+
+    def __init__(self, request_scoped: bool = False) -> None:
         self.session_factory = async_session_maker
+        # все транзакции запроса идут через одно соединение с основной БД (см. release)
+        self.request_scoped = request_scoped
+        self._connection: Optional[AsyncConnection] = None
+        # read-only: реплика (если настроена), BEGIN READ ONLY и rollback вместо commit
+        self.read_only = False
+        # репозитории возвращают строки вместо ORM-объектов из identity map
+        self.plain_rows = False
+        # вложенный вход открывает SAVEPOINT (флаг сбрасывается при входе)
+        self.savepoint = False
+        self._depth = 0
+        self._savepoints: list[tuple[Optional[AsyncSessionTransaction], int]] = []
+
+    @property
+    def active(self) -> bool:
+        return self._depth > 0
 
     async def __aenter__(self) -> None:
-        self.session = self.session_factory()
-        self.user = UserRepository(self.session)
-        self.company = CompanyRepository(self.session)
-        self.position = PositionRepository(self.session)
-        self.invite = InviteRepository(self.session)
-        self.department = DepartmentRepository(self.session)
-        self.role_assignment = RoleAssignmentRepository(self.session)
-        self.task = TaskRepository(self.session)
+        if self._depth:
+            # вложенный вызов присоединяется к текущей транзакции
+            savepoint = await self.session.begin_nested() if self.savepoint else None
+            self._savepoints.append((savepoint, len(self._after_commit)))
+            self.savepoint = False
+            self._depth += 1
+            return
+
+        self.savepoint = False
+        self.session = await self._open_session()
+        for name in self._REPOSITORIES:
+            self.__dict__.pop(name, None)
+        self._after_commit: list[Callable[[], Awaitable[Any]]] = []
+        self._depth = 1
 
     async def __aexit__(
         self,
@@ -64,12 +134,73 @@ class UnitOfWork(AbstractUnitOfWork):
         exc_val: Optional[BaseException],
         exc_tb: Optional[TracebackType],
     ) -> None:
-        if exc_type is None:
+        if self._depth > 1:
+            self._depth -= 1
+            savepoint, callbacks_mark = self._savepoints.pop()
+            if savepoint is not None:
+                if exc_type is None:
+                    await savepoint.commit()
+                else:
+                    await savepoint.rollback()
+                    # откаченная работа не должна запускать свои after_commit
+                    del self._after_commit[callbacks_mark:]
+            return
+
+        self._depth = 0
+        if exc_type is None and not self.read_only:
             await self.commit()
-        else:
+        elif exc_type is not None:
             await self.rollback()
+        # читающей транзакции нечего фиксировать: close() откатывает её дешевле commit
+        # и, в отличие от rollback(), не истекает загруженные объекты — их ещё сериализуют
         await self.session.close()
 
+        if exc_type is None and not self.read_only and settings.DB_PIN_PRIMARY_AFTER_WRITE:
+            pin_to_primary()
+
+        if exc_type is None:
+            callbacks, self._after_commit = self._after_commit, []
+            for callback in callbacks:
+                await callback()
+
+    async def _open_session(self) -> AsyncSession:
+        execution_options = {"postgresql_readonly": True} if self.read_only else None
+
+        if self.read_only and not _pinned_to_primary.get():
+            replica_session_maker = next_replica_session_maker()
+            if replica_session_maker is not None:
+                session = replica_session_maker()
+                try:
+                    await session.connection(execution_options=execution_options)
+                    return session
+                except (OSError, SQLAlchemyError):
+                    logger.warning("Replica is unavailable, falling back to primary", exc_info=True)
+                    await session.close()
+
+        if self.request_scoped:
+            if self._connection is None:
+                self._connection = await engine.connect()
+            session = self.session_factory(bind=self._connection)
+            # режим остаётся на соединении между транзакциями — выставляем его каждый раз
+            await session.connection(execution_options={"postgresql_readonly": self.read_only})
+            return session
+
+        session = self.session_factory()
+        if execution_options:
+            await session.connection(execution_options=execution_options)
+        return session
+
+    async def release(self) -> None:
+        """Возвращает удерживаемое запросом соединение в пул."""
+        if self._connection is None or self.active:
+            return
+        connection, self._connection = self._connection, None
+        await connection.close()
+
+    def after_commit(self, callback: Callable[[], Awaitable[Any]]) -> None:
+        """Регистрирует корутину, которая выполнится после успешного коммита."""
+        self._after_commit.append(callback)
+
     async def commit(self) -> None:
         await self.session.commit()
 
@@ -80,15 +211,56 @@ class UnitOfWork(AbstractUnitOfWork):
 AsyncFunc = Callable[..., Awaitable[Any]]
 
 
-def transaction_mode(func: AsyncFunc) -> AsyncFunc:
+def transaction_mode(
+    func: Optional[AsyncFunc] = None,
+    *,
+    read_only: bool = False,
+    plain_rows: bool = False,
+    savepoint: bool = False,
+) -> Any:
+    """
+    Оборачивает метод сервиса в транзакцию `self.uow`.
+
+    Используется как `@transaction_mode` или `@transaction_mode(read_only=True)`
+    для методов, которые только читают. `plain_rows=True` дополнительно
+    отключает identity map: репозитории возвращают строки (Row) с колонками модели.
+
+    Если метод вызван из другого метода с открытой транзакцией, он
+    присоединяется к ней (та же сессия и соединение), а commit/rollback
+    делает только внешний вызов. `savepoint=True` оборачивает такой
+    вложенный вызов в SAVEPOINT, чтобы его ошибка откатывала только его работу.
+    """
+
+    def decorator(func: AsyncFunc) -> AsyncFunc:
+        @functools.wraps(func)
+        async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            uow = self.uow
+            if uow.active:
+                if uow.read_only and not read_only:
+                    raise RuntimeError(
+                        f"{func.__qualname__} needs a read-write transaction "
+                        "but was called inside a read-only one"
+                    )
+                if uow.plain_rows and not plain_rows:
+                    raise RuntimeError(
+                        f"{func.__qualname__} needs ORM objects "
+                        "but was called inside a plain_rows transaction"
+                    )
+                uow.savepoint = savepoint
+            else:
+                uow.read_only = read_only
+                uow.plain_rows = plain_rows
+            async with uow:
+                return await func(self, *args, **kwargs)
 
-    @functools.wraps(func)
-    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
-        async with self.uow:
-            return await func(self, *args, **kwargs)
+        return wrapper
 
-    return wrapper
+    if func is None:
+        return decorator
+    return decorator(func)
 
 
-def get_uow() -> UnitOfWork:
-    return UnitOfWork()
+def get_uow(request: Request) -> UnitOfWork:
+    """UnitOfWork текущего запроса (см. RequestUnitOfWorkMiddleware)."""
+    uow = getattr(request.state, "uow", None)
+    return uow if uow is not None else UnitOfWork()
@@ -0,0 +1,128 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+
+logger = logging.getLogger("app.sql")
+
+
+class QueryStats:
+    """Статистика SQL‑запросов в рамках одного HTTP‑запроса."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        # statement уже параметризован — одинаковый текст значит одинаковую форму запроса
+        self.shapes[statement] += 1
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Формы запросов, выполненные `threshold` и более раз — кандидаты в N+1."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # на контексте выполнения, а не в conn.info: при ошибке after_cursor_execute не
+    # вызывается, и стек на пуловом соединении рос бы и путал вложенные выполнения
+    context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start_time
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Подключает сбор статистики к (sync‑)движку SQLAlchemy."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _shorten(statement: Optional[str], limit: int = 200) -> str:
+    statement = " ".join((statement or "").split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+class SQLStatsMiddleware:
+    """
+    Считает SQL‑запросы на каждый HTTP‑запрос: количество, суммарное время БД
+    и самый медленный запрос. В DEBUG‑режиме добавляет заголовки X-DB-*,
+    повторяющиеся формы запросов (N+1) пишет в лог предупреждением.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.debug = settings.DEBUG
+        self.threshold = settings.SQL_N_PLUS_ONE_THRESHOLD
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.debug:
+                message.setdefault("headers", [])
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(stats.count)
+                headers["X-DB-Time-Ms"] = f"{stats.total_time * 1000:.2f}"
+                headers["X-DB-Slowest-Ms"] = f"{stats.slowest_time * 1000:.2f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_stats.reset(token)
+            self._log(scope, stats)
+
+    def _log(self, scope: Scope, stats: QueryStats) -> None:
+        if not stats.count:
+            return
+
+        logger.info(
+            "%s %s: %d queries, %.2f ms in DB, slowest %.2f ms: %s",
+            scope["method"],
+            scope["path"],
+            stats.count,
+            stats.total_time * 1000,
+            stats.slowest_time * 1000,
+            _shorten(stats.slowest_statement),
+        )
+        for shape, n in stats.repeated(self.threshold):
+            logger.warning(
+                "Possible N+1 in %s %s: statement executed %d times: %s",
+                scope["method"],
+                scope["path"],
+                n,
+                _shorten(shape),
+            )
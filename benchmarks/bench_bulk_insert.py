@@ -0,0 +1,110 @@
+"""
+Бенчмарк пачечной записи на таблице companies: построчный INSERT и ORM
+`add_all` + flush против add_many / add_many(returning_ids) / update_many /
+upsert_many базового репозитория.
+
+Каждый вариант выполняется в своей транзакции, которая откатывается, —
+в БД ничего не остаётся. Нужен PostgreSQL с применёнными миграциями
+(настройки DB_* из окружения, как у приложения).
+
+    PYTHONPATH=. python benchmarks/bench_bulk_insert.py [--rows 10000]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+import app.main  # noqa: F401 — регистрирует все модели для мапперов
+from app.database import async_session_maker, engine
+from app.models.companies import CompanyModel
+from app.repositories.company import CompanyRepository
+
+# prepare выполняется до замера и отдаёт вход для варианта (по умолчанию — rows)
+Variant = Callable[[CompanyRepository, Any], Awaitable[object]]
+
+
+async def per_row(repo: CompanyRepository, rows: list[dict]) -> None:
+    for row in rows:
+        await repo.add_one_and_get_id(**row)
+
+
+async def orm_add_all(repo: CompanyRepository, rows: list[dict]) -> None:
+    repo.session.add_all(CompanyModel(**row) for row in rows)
+    await repo.session.flush()
+
+
+async def add_many(repo: CompanyRepository, rows: list[dict]) -> None:
+    await repo.add_many(rows)
+
+
+async def add_many_returning_ids(repo: CompanyRepository, rows: list[dict]) -> None:
+    ids = await repo.add_many(rows, returning_ids=True)
+    assert len(ids) == len(rows)
+
+
+async def update_many(repo: CompanyRepository, values_by_id: dict[int, dict]) -> None:
+    await repo.update_many(values_by_id)
+
+
+async def upsert_many(repo: CompanyRepository, rows: list[dict]) -> None:
+    # половина строк уже есть (prepare): конфликт по name -> DO UPDATE
+    ids = await repo.upsert_many(rows, index_elements=["name"], update_fields=["name"], returning_ids=True)
+    assert len(ids) == len(rows)
+
+
+async def prepare_existing(repo: CompanyRepository, rows: list[dict]) -> dict[int, dict]:
+    ids = await repo.add_many(rows, returning_ids=True)
+    return {obj_id: {"name": f"{row['name']}-u"} for obj_id, row in zip(ids, rows)}
+
+
+async def prepare_half(repo: CompanyRepository, rows: list[dict]) -> list[dict]:
+    await repo.add_many(rows[: len(rows) // 2])
+    return rows
+
+
+VARIANTS: dict[str, tuple[Variant, Variant | None]] = {
+    "add_one_and_get_id x N": (per_row, None),
+    "ORM add_all + flush": (orm_add_all, None),
+    "add_many": (add_many, None),
+    "add_many(returning_ids)": (add_many_returning_ids, None),
+    "update_many": (update_many, prepare_existing),
+    "upsert_many (50% conflicts)": (upsert_many, prepare_half),
+}
+
+
+async def measure(variant: Variant, prepare: Variant | None, count: int) -> float:
+    suffix = uuid.uuid4().hex[:8]
+    rows = [{"name": f"bench-{suffix}-{i}"} for i in range(count)]
+    async with async_session_maker() as session:
+        try:
+            repo = CompanyRepository(session)
+            payload = rows if prepare is None else await prepare(repo, rows)
+            started = time.perf_counter()
+            await variant(repo, payload)
+            return time.perf_counter() - started
+        finally:
+            await session.rollback()
+
+
+async def main(count: int, rounds: int) -> None:
+    results: dict[str, list[float]] = {name: [] for name in VARIANTS}
+    try:
+        # чередуем варианты, чтобы дрейф БД не копился в одном из них
+        for _ in range(rounds):
+            for name, (variant, prepare) in VARIANTS.items():
+                results[name].append(await measure(variant, prepare, count))
+    finally:
+        await engine.dispose()
+
+    for name, timings in results.items():
+        best = min(timings)
+        print(f"{name:>28}: {best * 1e3:8.1f} ms  {count / best:8.0f} rows/s  (best of {rounds})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.rounds))
@@ -0,0 +1,109 @@
+"""
+Бенчмарк построения путей отделов по именам на дереве из 5000 отделов
+(корень, 9 дивизионов, 90 групп, 4900 команд): get_descendants_with_names /
+get_ancestors_with_names одним запросом против get_visualized_path на каждый
+отдел выборки. Печатает время и число SQL‑запросов.
+
+Дерево вставляется через add_tree в транзакции, которая в конце
+откатывается. Нужен PostgreSQL с применёнными миграциями и расширением
+ltree (настройки DB_* из окружения, как у приложения).
+
+    PYTHONPATH=. python benchmarks/bench_department_paths.py [--rounds 3]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from sqlalchemy import event
+
+import app.main  # noqa: F401 — регистрирует все модели для мапперов
+from app.database import async_session_maker, engine
+from app.repositories.company import CompanyRepository
+from app.repositories.department import DepartmentRepository
+
+DIVISIONS, GROUPS, TEAMS = 9, 90, 4900
+
+
+class _QueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *args) -> None:
+        self.count += 1
+
+
+def nodes() -> list[tuple[str, int | None]]:
+    # индексы в списке: 0 — корень, 1..9 — дивизионы, 10..99 — группы, дальше команды
+    return (
+        [("root", None)]
+        + [(f"div{d}", 0) for d in range(DIVISIONS)]
+        + [(f"grp{g}", 1 + g % DIVISIONS) for g in range(GROUPS)]
+        + [(f"team{t}", 1 + DIVISIONS + t % GROUPS) for t in range(TEAMS)]
+    )
+
+
+async def per_row_paths(repo: DepartmentRepository, departments: list, company_id: int) -> list[str]:
+    return [await repo.get_visualized_path(department.id, company_id) for department in departments]
+
+
+async def main(rounds: int) -> None:
+    counter = _QueryCounter()
+    event.listen(engine.sync_engine, "after_cursor_execute", counter)
+    async with async_session_maker() as session:
+        try:
+            repo = DepartmentRepository(session)
+            (company_id,) = await CompanyRepository(session).add_many(
+                [{"name": f"bench-{uuid.uuid4().hex[:8]}"}], returning_ids=True
+            )
+            ids = await repo.add_tree(nodes(), company_id=company_id)
+            root, division, leaf = ids[0], ids[1], ids[-1]
+
+            descendants = await repo.get_descendants(root, company_id)
+            ancestors = await repo.get_ancestors(leaf, company_id)
+            # обе реализации должны строить одни и те же пути
+            assert sorted(await repo.get_descendants_with_names(root, company_id)) == sorted(
+                await per_row_paths(repo, descendants, company_id)
+            )
+
+            # построчный вариант — запрос на отдел, на всём дереве его хватает одного прогона
+            cases: dict[str, tuple[Callable[[], Awaitable[list]], int]] = {
+                "descendants of root, per row": (
+                    lambda: per_row_paths(repo, descendants, company_id), 1
+                ),
+                "descendants of root": (
+                    lambda: repo.get_descendants_with_names(root, company_id), rounds
+                ),
+                "descendants of a division": (
+                    lambda: repo.get_descendants_with_names(division, company_id), rounds
+                ),
+                "ancestors of a leaf, per row": (
+                    lambda: per_row_paths(repo, ancestors, company_id), rounds
+                ),
+                "ancestors of a leaf": (
+                    lambda: repo.get_ancestors_with_names(leaf, company_id), rounds
+                ),
+            }
+            for name, (case, runs) in cases.items():
+                timings = []
+                for _ in range(runs):
+                    counter.count = 0
+                    started = time.perf_counter()
+                    items = await case()
+                    timings.append(time.perf_counter() - started)
+                print(
+                    f"{name:>30}: {min(timings) * 1e3:8.1f} ms  queries={counter.count:5d}"
+                    f"  items={len(items):5d}  (best of {runs})"
+                )
+        finally:
+            event.remove(engine.sync_engine, "after_cursor_execute", counter)
+            await session.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds))
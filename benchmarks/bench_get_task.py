@@ -0,0 +1,138 @@
+"""
+Сквозной бенчмарк `GET /v1/tasks/{id}`: principal из auth‑middleware
+переиспользуется в get_current_user («after») против повторной полной
+проверки подписи JWT в зависимости на каждый запрос («before»).
+
+Нужны PostgreSQL с применёнными миграциями (настройки DB_* из окружения,
+как у приложения) и JWT‑ключи. Redis не нужен: хранилище отзывов токенов
+подменяется пустым in‑memory хэшем, кэш статусов пользователей — прогрет.
+
+    PYTHONPATH=. python benchmarks/bench_get_task.py [--requests 3000]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Optional
+
+import httpx
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import text
+
+from app.auth.auth_utils import _bearer_scheme, decode_jwt, encode_jwt, get_current_user
+from app.auth.keys import keyring
+from app.auth.revocation import token_revocations
+from app.database import engine
+from app.main import app
+from app.schemas.auth import UserToken
+
+
+class _EmptyRevocationStore:
+    """Минимум Redis‑хэша для TokenRevocations: отозванных токенов нет."""
+
+    async def hget(self, key: str, field: str) -> Optional[str]:
+        return None
+
+
+async def decode_every_time(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer_scheme),
+) -> UserToken:
+    """Зависимость, которая заново декодирует токен и проверяет его подпись."""
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    # явный ключ — мимо кэша проверенных токенов, как в исходной версии
+    payload = decode_jwt(credentials.credentials, key=keyring.signing_key())
+    return UserToken(
+        user_id=int(payload["sub"]),
+        company_id=payload.get("company_id"),
+        is_admin=payload.get("is_admin", False),
+    )
+
+
+async def seed() -> tuple[int, int, int]:
+    suffix = uuid.uuid4().hex[:8]
+    async with engine.begin() as conn:
+        company_id = (await conn.execute(
+            text("INSERT INTO companies (name) VALUES (:name) RETURNING id"),
+            {"name": f"bench-{suffix}"},
+        )).scalar_one()
+        user_id = (await conn.execute(
+            text(
+                "INSERT INTO users (email, hashed_password, first_name, last_name,"
+                " is_active, is_admin, company_id)"
+                " VALUES (:email, 'x', 'Bench', 'User', true, true, :company_id) RETURNING id"
+            ),
+            {"email": f"bench-{suffix}@example.com", "company_id": company_id},
+        )).scalar_one()
+        task_id = (await conn.execute(
+            text(
+                "INSERT INTO tasks (title, author_id, responsible_id, status)"
+                " VALUES ('bench', :user_id, :user_id, 'NEW') RETURNING id"
+            ),
+            {"user_id": user_id},
+        )).scalar_one()
+        await conn.execute(
+            text("INSERT INTO task_executors (task_id, user_id) VALUES (:task_id, :user_id)"),
+            {"task_id": task_id, "user_id": user_id},
+        )
+    return company_id, user_id, task_id
+
+
+async def cleanup(company_id: int, user_id: int, task_id: int) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM task_executors WHERE task_id = :id"), {"id": task_id})
+        await conn.execute(text("DELETE FROM tasks WHERE id = :id"), {"id": task_id})
+        await conn.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+        await conn.execute(text("DELETE FROM companies WHERE id = :id"), {"id": company_id})
+
+
+async def measure(client: httpx.AsyncClient, path: str, headers: dict, requests: int) -> float:
+    for _ in range(50):  # прогрев: пул соединений, кэш статусов, кэш токенов
+        response = await client.get(path, headers=headers)
+        assert response.status_code == 200, response.text
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await client.get(path, headers=headers)
+    return (time.perf_counter() - started) / requests
+
+
+async def main(requests: int, rounds: int) -> None:
+    token_revocations.bind(_EmptyRevocationStore())
+    company_id, user_id, task_id = await seed()
+    try:
+        token = encode_jwt(
+            {"sub": user_id, "company_id": company_id, "is_admin": True, "is_active": True}
+        )
+        headers = {"Authorization": f"Bearer {token}"}
+        path = f"/v1/tasks/{task_id}"
+
+        results: dict[str, list[float]] = {"before": [], "after": []}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # чередуем варианты, чтобы дрейф БД и прогрев не копились в одном из них
+            for _ in range(rounds):
+                app.dependency_overrides[get_current_user] = decode_every_time
+                results["before"].append(await measure(client, path, headers, requests))
+                app.dependency_overrides.clear()
+                results["after"].append(await measure(client, path, headers, requests))
+
+        for name, timings in results.items():
+            best = min(timings)
+            print(f"{name:>6}: {best * 1e6:7.0f} us/req  {1 / best:6.0f} req/s  (best of {rounds})")
+        saved = min(results["before"]) - min(results["after"])
+        print(f" saved: {saved * 1e6:7.0f} us/req")
+    finally:
+        app.dependency_overrides.clear()
+        await cleanup(company_id, user_id, task_id)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds))
@@ -0,0 +1,60 @@
+"""
+Микробенчмарк подписи и проверки JWT для типов ключей KeyRing: RS256,
+ES256 и EdDSA. Ключи генерируются в памяти; проверка идёт с явным ключом,
+мимо кэша проверенных токенов — меряется сама криптография и PyJWT.
+
+Нужно окружение приложения (настройки и JWT‑ключи читаются при импорте),
+БД и Redis не используются.
+
+    PYTHONPATH=. python benchmarks/bench_jwt.py [--iterations 2000]
+"""
+import argparse
+import time
+from typing import Callable
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from app.auth.auth_utils import decode_jwt, encode_jwt
+from app.auth.keys import JWTKey
+
+PAYLOAD = {"sub": 1, "company_id": 1, "is_admin": False, "is_active": True}
+
+
+def make_keys() -> list[JWTKey]:
+    private_keys = {
+        "RS256": rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "ES256": ec.generate_private_key(ec.SECP256R1()),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate(),
+    }
+    return [
+        JWTKey(algorithm, algorithm, private_key.public_key(), private_key)
+        for algorithm, private_key in private_keys.items()
+    ]
+
+
+def per_call(func: Callable[[], object], iterations: int) -> float:
+    for _ in range(iterations // 10):  # прогрев
+        func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations
+
+
+def main(iterations: int) -> None:
+    print(f"{'':>6}  {'sign':>9}  {'verify':>9}  token")
+    for key in make_keys():
+        token = encode_jwt(PAYLOAD, key=key)
+        sign = per_call(lambda: encode_jwt(PAYLOAD, key=key), iterations)
+        verify = per_call(lambda: decode_jwt(token, key=key), iterations)
+        print(
+            f"{key.algorithm:>6}  {sign * 1e6:6.0f} us  {verify * 1e6:6.0f} us"
+            f"  {len(token)} bytes"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,189 @@
+"""
+Бенчмарк поиска подчинённых на 100k сотрудников: рекурсивный CTE по
+users.manager_id (прежняя реализация, встроена сюда) против таблицы‑замыкания
+user_hierarchy — get_all_subordinates и is_subordinate.
+
+Данные засеиваются в одной транзакции (компании по 2000 сотрудников,
+дерево руководителей глубиной до 4 уровней под директором) и в конце
+откатываются. Нужен PostgreSQL с применёнными миграциями (настройки DB_*
+из окружения, как у приложения).
+
+    PYTHONPATH=. python benchmarks/bench_subordinates.py [--users 100000]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from sqlalchemy import any_, func, literal, not_, select
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.main  # noqa: F401 — регистрирует все модели для мапперов
+from app.database import async_session_maker, engine
+from app.repositories.company import CompanyRepository
+from app.repositories.user import UserRepository
+
+USERS_PER_COMPANY = 2000
+BRANCHING = 7  # 1 + 7 + 49 + 343 + 1600 — четыре уровня под директором
+
+
+async def cte_subordinates(
+    session: AsyncSession, user_id: int, company_id: int, limit: int | None = None
+) -> list[dict]:
+    """get_all_subordinates до таблицы‑замыкания: обход дерева рекурсивным CTE."""
+    users = UserRepository.model.__table__
+    tree = (
+        select(
+            users.c.id,
+            literal(1).label("depth"),
+            array([literal(user_id), users.c.id]).label("path"),
+        )
+        .where(users.c.company_id == company_id, users.c.manager_id == user_id)
+        .cte("subordinates", recursive=True)
+    )
+    tree = tree.union_all(
+        select(users.c.id, tree.c.depth + 1, func.array_append(tree.c.path, users.c.id))
+        .join(tree, users.c.manager_id == tree.c.id)
+        .where(users.c.company_id == company_id, not_(users.c.id == any_(tree.c.path)))
+    )
+    query = (
+        select(
+            users.c.id,
+            users.c.email,
+            users.c.first_name,
+            users.c.last_name,
+            users.c.manager_id,
+            users.c.department_id,
+            tree.c.depth,
+        )
+        .join(tree, users.c.id == tree.c.id)
+        .order_by(tree.c.depth, users.c.id)
+        .limit(limit)
+    )
+    return [dict(row) for row in (await session.execute(query)).mappings()]
+
+
+async def cte_is_subordinate(session: AsyncSession, user_id: int, manager_id: int) -> bool:
+    """is_subordinate до таблицы‑замыкания: подъём по цепочке руководителей."""
+    users = UserRepository.model.__table__
+    chain = (
+        select(users.c.manager_id.label("id"))
+        .where(users.c.id == user_id)
+        .cte("chain", recursive=True)
+    )
+    chain = chain.union_all(
+        select(users.c.manager_id)
+        .join(chain, users.c.id == chain.c.id)
+        .where(users.c.manager_id.is_not(None))
+    )
+    query = select(select(chain.c.id).where(chain.c.id == manager_id).exists())
+    return (await session.execute(query)).scalar_one()
+
+
+async def seed(session: AsyncSession, total: int) -> list[tuple[int, list[int]]]:
+    """Компании с деревом руководителей; возвращает (company_id, ids по уровням дерева)."""
+    suffix = uuid.uuid4().hex[:8]
+    companies = CompanyRepository(session)
+    users = UserRepository(session)
+
+    company_ids = await companies.add_many(
+        [{"name": f"bench-{suffix}-{i}"} for i in range(total // USERS_PER_COMPANY)],
+        returning_ids=True,
+    )
+    seeded = []
+    for company_id in company_ids:
+        ids = await users.add_many(
+            [
+                {
+                    "email": f"bench-{suffix}-{company_id}-{i}@example.com",
+                    "hashed_password": "x",
+                    "first_name": "Bench",
+                    "last_name": str(i),
+                    "is_active": True,
+                    "is_admin": False,
+                    "company_id": company_id,
+                }
+                for i in range(USERS_PER_COMPANY)
+            ],
+            returning_ids=True,
+        )
+        # i-й сотрудник подчиняется (i - 1) // BRANCHING-му: полное BRANCHING-арное дерево
+        await users.update_many(
+            {ids[i]: {"manager_id": ids[(i - 1) // BRANCHING]} for i in range(1, len(ids))}
+        )
+        seeded.append((company_id, ids))
+    await users.rebuild_hierarchy()
+    return seeded
+
+
+async def per_call(func: Callable[[], Awaitable[object]], calls: int) -> float:
+    for _ in range(max(calls // 10, 1)):  # прогрев: план запроса и буферы
+        await func()
+    started = time.perf_counter()
+    for _ in range(calls):
+        await func()
+    return (time.perf_counter() - started) / calls
+
+
+async def main(total: int, calls: int, rounds: int) -> None:
+    async with async_session_maker() as session:
+        try:
+            started = time.perf_counter()
+            seeded = await seed(session, total)
+            print(f"seeded {total} users in {len(seeded)} companies: {time.perf_counter() - started:.1f} s")
+
+            repo = UserRepository(session)
+            company_id, ids = seeded[len(seeded) // 2]
+            director, middle, leaf = ids[0], ids[1], ids[-1]
+
+            # варианты должны отдавать одно и то же
+            for user_id in (director, middle):
+                assert await cte_subordinates(session, user_id, company_id) == (
+                    await repo.get_all_subordinates(user_id, company_id=company_id)
+                )
+            assert await cte_is_subordinate(session, leaf, director)
+            assert await repo.is_subordinate(leaf, director)
+
+            cases: dict[str, tuple[Callable, Callable]] = {
+                f"subtree of director ({len(ids) - 1})": (
+                    lambda: cte_subordinates(session, director, company_id),
+                    lambda: repo.get_all_subordinates(director, company_id=company_id),
+                ),
+                "first page of 100": (
+                    lambda: cte_subordinates(session, director, company_id, limit=100),
+                    lambda: repo.get_all_subordinates(director, company_id=company_id, limit=100),
+                ),
+                "subtree of middle manager": (
+                    lambda: cte_subordinates(session, middle, company_id),
+                    lambda: repo.get_all_subordinates(middle, company_id=company_id),
+                ),
+                "is_subordinate(leaf, director)": (
+                    lambda: cte_is_subordinate(session, leaf, director),
+                    lambda: repo.is_subordinate(leaf, director),
+                ),
+            }
+            print(f"{'':>32}  {'cte':>9}  {'closure':>9}")
+            for name, (cte, closure) in cases.items():
+                timings: dict[str, list[float]] = {"cte": [], "closure": []}
+                # чередуем варианты, чтобы прогрев не копился в одном из них
+                for _ in range(rounds):
+                    timings["cte"].append(await per_call(cte, calls))
+                    timings["closure"].append(await per_call(closure, calls))
+                print(
+                    f"{name:>32}  {min(timings['cte']) * 1e3:6.2f} ms"
+                    f"  {min(timings['closure']) * 1e3:6.2f} ms"
+                )
+        finally:
+            await session.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.calls, args.rounds))
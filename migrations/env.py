@@ -18,6 +18,7 @@ from app.models.positions import PositionModel
 from app.models.roles import RoleAssignmentModel
 from app.models.tasks import TaskModel
 from app.models.users import UserModel
+from app.models.user_hierarchy import UserHierarchyModel
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,28 @@
+"""users company/manager index
+
+Revision ID: b41c7e9a2d15
+Revises: eaba36dcee8c
+Create Date: 2026-10-17 11:42:08.513274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41c7e9a2d15'
+down_revision: Union[str, None] = 'eaba36dcee8c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # рекурсивный обход подчинённых идёт по manager_id внутри компании
+    op.create_index('ix_users_company_id_manager_id', 'users', ['company_id', 'manager_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_company_id_manager_id', table_name='users')
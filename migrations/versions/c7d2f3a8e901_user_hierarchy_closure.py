@@ -0,0 +1,52 @@
+"""user hierarchy closure
+
+Revision ID: c7d2f3a8e901
+Revises: b41c7e9a2d15
+Create Date: 2026-10-17 14:05:31.772190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2f3a8e901'
+down_revision: Union[str, None] = 'b41c7e9a2d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_hierarchy',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_user_hierarchy_descendant_id_depth', 'user_hierarchy', ['descendant_id', 'depth'], unique=False)
+
+    # заполняем замыкание по текущим manager_id (то же, что rebuild_user_hierarchy)
+    op.execute("""
+        WITH RECURSIVE chain(ancestor_id, descendant_id, depth, path) AS (
+            SELECT manager_id, id, 1, ARRAY[id, manager_id]
+            FROM users
+            WHERE manager_id IS NOT NULL
+            UNION ALL
+            SELECT u.manager_id, chain.descendant_id, chain.depth + 1, chain.path || u.manager_id
+            FROM chain JOIN users u ON u.id = chain.ancestor_id
+            WHERE u.manager_id IS NOT NULL AND NOT u.manager_id = ANY(chain.path)
+        )
+        INSERT INTO user_hierarchy (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, depth FROM chain
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_hierarchy_descendant_id_depth', table_name='user_hierarchy')
+    op.drop_table('user_hierarchy')
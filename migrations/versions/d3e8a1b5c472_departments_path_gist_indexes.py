@@ -0,0 +1,39 @@
+"""departments path gist indexes
+
+Revision ID: d3e8a1b5c472
+Revises: c7d2f3a8e901
+Create Date: 2026-10-17 16:20:47.104385
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3e8a1b5c472'
+down_revision: Union[str, None] = 'c7d2f3a8e901'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS ltree")
+    # GiST‑оператор для integer (company_id) в составном индексе
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    # B-tree ix_departments_path остаётся: по нему идут равенство и ORDER BY path
+    op.create_index(
+        'ix_departments_path_gist', 'departments', ['path'], unique=False,
+        postgresql_using='gist', postgresql_ops={'path': 'gist_ltree_ops(siglen=100)'},
+    )
+    op.create_index(
+        'ix_departments_company_id_path_gist', 'departments', ['company_id', 'path'], unique=False,
+        postgresql_using='gist', postgresql_ops={'path': 'gist_ltree_ops(siglen=100)'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_departments_company_id_path_gist', table_name='departments')
+    op.drop_index('ix_departments_path_gist', table_name='departments')
@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from redis.asyncio import Redis
+
+from app.auth.rate_limit import SlidingWindowLimiter
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def hanging_redis():
+    """Сервер, который принимает соединение и ничего не отвечает — зависший Redis."""
+    connections = []
+
+    async def accept(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connections.append(writer)
+
+    server = await asyncio.start_server(accept, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    redis = Redis(
+        host="127.0.0.1", port=port, decode_responses=True,
+        socket_connect_timeout=0.2, socket_timeout=0.2,
+    )
+    try:
+        yield redis
+    finally:
+        await redis.close()
+        for writer in connections:
+            writer.close()
+        server.close()
+        await server.wait_closed()
+
+
+async def test_hanging_redis_falls_back_to_local_counters(hanging_redis):
+    limiter = SlidingWindowLimiter(prefix="test", window=60)
+    limiter.bind(hanging_redis)
+
+    started = time.monotonic()
+    await limiter.hit({"email:a": 2})
+    await limiter.hit({"email:a": 2})
+    with pytest.raises(HTTPException) as error:
+        await limiter.hit({"email:a": 2})
+
+    assert error.value.status_code == 429
+    # три попытки: каждая ждёт Redis не дольше socket_timeout
+    assert time.monotonic() - started < 2
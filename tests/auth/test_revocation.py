@@ -0,0 +1,60 @@
+import re
+import time
+from typing import Optional
+
+import httpx
+import pytest
+
+from app.auth.auth_utils import encode_jwt
+from app.auth.middleware import PUBLIC_PATH_MATCHER
+from app.auth.revocation import token_revocations
+from app.main import app
+
+pytestmark = pytest.mark.anyio
+
+
+class _RevokedStore:
+    """Redis‑хэш отзывов, в котором отозваны все токены всех пользователей."""
+
+    async def hget(self, key: str, field: str) -> Optional[str]:
+        return str(int(time.time()) + 3600)
+
+
+def _authenticated_routes() -> list[tuple[str, str]]:
+    # HTTPBearer в схеме операции есть ровно у маршрутов с Depends(get_current_user)
+    return [
+        (method.upper(), re.sub(r"\{[^}]+\}", "1", path))
+        for path, operations in app.openapi()["paths"].items()
+        for method, operation in operations.items()
+        if any("HTTPBearer" in scheme for scheme in operation.get("security", []))
+    ]
+
+
+@pytest.fixture
+def revoked_token():
+    previous = token_revocations.redis, token_revocations._filter
+    token_revocations.bind(_RevokedStore())
+    token_revocations._filter = None
+    try:
+        yield encode_jwt({"sub": 5, "company_id": 1, "is_admin": True, "is_active": True})
+    finally:
+        token_revocations.redis, token_revocations._filter = previous
+
+
+def test_authenticated_routes_are_not_public():
+    routes = _authenticated_routes()
+
+    assert ("PATCH", "/v1/user/1/update-email") in routes
+    assert not [path for _, path in routes if PUBLIC_PATH_MATCHER.match(path)]
+
+
+@pytest.mark.parametrize(("method", "path"), _authenticated_routes())
+async def test_revoked_token_is_rejected(revoked_token, method, path):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.request(
+            method, path, headers={"Authorization": f"Bearer {revoked_token}"}
+        )
+
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Token revoked"}
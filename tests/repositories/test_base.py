@@ -0,0 +1,221 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import pytest
+from sqlalchemy import DateTime, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.repositories.base import SqlAlchemyRepository, encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class _Base(DeclarativeBase):
+    # своя metadata: базовому репозиторию не нужны модели приложения и ltree
+    pass
+
+
+class ItemModel(_Base):
+    __tablename__ = "test_items"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(unique=True)
+    score: Mapped[int]
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    note: Mapped[Optional[str]]
+
+
+class ItemRepository(SqlAlchemyRepository):
+    model = ItemModel
+
+
+def _rows(count: int) -> list[dict]:
+    # много одинаковых score и created_at: порядок внутри них решает id
+    return [
+        {
+            "id": i,
+            "name": f"item{i}",
+            "score": i % 4,
+            "created_at": START + timedelta(microseconds=i % 5),
+            "note": None,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+@pytest.fixture
+async def repo(connection, session) -> ItemRepository:
+    await connection.run_sync(_Base.metadata.create_all, checkfirst=False)
+    return ItemRepository(session)
+
+
+async def _walk(repo: ItemRepository, limit: int, **kwargs) -> list[list[int]]:
+    pages, cursor = [], None
+    while True:
+        page = await repo.get_page(cursor=cursor, limit=limit, **kwargs)
+        pages.append([item.id for item in page.items])
+        if page.next_cursor is None:
+            return pages
+        cursor = page.next_cursor
+
+
+async def _ids(repo: ItemRepository) -> list[int]:
+    return list((await repo.session.execute(select(ItemModel.id).order_by(ItemModel.id))).scalars())
+
+
+async def test_get_page_walks_all_rows_once(repo):
+    await repo.add_many(_rows(10))
+
+    pages = await _walk(repo, limit=3)
+
+    assert pages == [[1, 2, 3], [4, 5, 6], [7, 8, 9], [10]]
+
+
+async def test_get_page_last_full_page_has_no_cursor(repo):
+    await repo.add_many(_rows(6))
+
+    pages = await _walk(repo, limit=3)
+
+    # limit+1 строк не нашлось — пустой страницы в конце нет
+    assert pages == [[1, 2, 3], [4, 5, 6]]
+    assert (await repo.get_page(limit=6)).next_cursor is None
+
+
+async def test_get_page_empty_table(repo):
+    page = await repo.get_page(limit=5)
+
+    assert page.items == [] and page.next_cursor is None
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("order_by", ["score", "created_at"])
+async def test_get_page_breaks_ties_by_id(repo, order_by, descending):
+    rows = _rows(23)
+    await repo.add_many(rows)
+
+    pages = await _walk(repo, limit=4, order_by=order_by, descending=descending)
+
+    expected = sorted(rows, key=lambda row: (row[order_by], row["id"]), reverse=descending)
+    assert [item_id for page in pages for item_id in page] == [row["id"] for row in expected]
+    # страница обрывается посреди группы одинаковых значений
+    assert all(len(page) == 4 for page in pages[:-1])
+
+
+async def test_get_page_applies_filters_with_cursor(repo):
+    await repo.add_many(_rows(20))
+
+    pages = await _walk(repo, limit=2, order_by="score", score__gte=2, name__ne="item3")
+
+    expected = [2, 6, 10, 14, 18, 7, 11, 15, 19]
+    assert [item_id for page in pages for item_id in page] == expected
+
+
+async def test_get_page_cursor_is_not_offset(repo):
+    await repo.add_many(_rows(6))
+    first = await repo.get_page(limit=3)
+
+    # строки, добавленные перед курсором, не сдвигают следующую страницу
+    await repo.add_one(id=0, name="item0", score=0, created_at=START)
+    second = await repo.get_page(cursor=first.next_cursor, limit=3)
+
+    assert [item.id for item in second.items] == [4, 5, 6]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        encode_cursor([1]),  # по score нужен ключ (score, id)
+        encode_cursor(["high", 1]),
+        encode_cursor([1, 2, 3]),
+    ],
+)
+async def test_get_page_rejects_bad_cursor(repo, cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        await repo.get_page(order_by="score", cursor=cursor)
+
+
+async def test_get_page_rejects_nullable_column(repo):
+    with pytest.raises(ValueError, match="nullable"):
+        await repo.get_page(order_by="note")
+
+
+async def test_upsert_many_updates_only_given_fields(repo):
+    await repo.add_many(_rows(2))
+    await repo.session.execute(ItemModel.__table__.update().values(note="kept"))
+
+    await repo.upsert_many(
+        [
+            {"id": 8, "name": "item1", "score": 100, "created_at": START, "note": "new"},
+            {"id": 9, "name": "item9", "score": 9, "created_at": START, "note": "new"},
+        ],
+        index_elements=["name"],
+        update_fields=["score"],
+    )
+
+    rows = (await repo.session.execute(
+        select(ItemModel.name, ItemModel.score, ItemModel.note).order_by(ItemModel.name)
+    )).all()
+    assert [tuple(row) for row in rows] == [
+        ("item1", 100, "kept"),
+        ("item2", 2, "kept"),
+        ("item9", 9, "new"),
+    ]
+
+
+async def test_upsert_many_updates_all_but_key_by_default(repo):
+    await repo.add_many(_rows(1))
+
+    await repo.upsert_many(
+        [{"id": 1, "name": "item1", "score": 7, "created_at": START, "note": "new"}],
+        index_elements=["name"],
+    )
+
+    item = (await repo.session.execute(select(ItemModel.score, ItemModel.note))).one()
+    assert tuple(item) == (7, "new")
+
+
+async def test_upsert_many_do_nothing_skips_existing(repo):
+    await repo.add_many(_rows(2))
+
+    ids = await repo.upsert_many(
+        [
+            {"id": 10, "name": "item1", "score": 100, "created_at": START},
+            {"id": 11, "name": "item3", "score": 3, "created_at": START},
+        ],
+        index_elements=["name"],
+        update_fields=[],
+        returning_ids=True,
+    )
+
+    # RETURNING отдаёт только вставленные строки
+    assert ids == [11]
+    assert await _ids(repo) == [1, 2, 11]
+    assert (await repo.get_by_id(1)).score == 1
+
+
+async def test_upsert_many_returns_ids_in_input_order(repo):
+    await repo.add_many(_rows(3))
+
+    ids = await repo.upsert_many(
+        [
+            {"id": 20, "name": "item20", "score": 0, "created_at": START},
+            {"id": 99, "name": "item3", "score": 0, "created_at": START},
+            {"id": 10, "name": "item10", "score": 0, "created_at": START},
+            {"id": 98, "name": "item1", "score": 0, "created_at": START},
+        ],
+        index_elements=["name"],
+        update_fields=["score"],
+        returning_ids=True,
+    )
+
+    # для обновлённых строк — их прежние id, не переданные
+    assert ids == [20, 3, 10, 1]
+
+
+async def test_upsert_many_empty_rows(repo):
+    assert await repo.upsert_many([], index_elements=["name"], returning_ids=True) == []
+    assert await repo.upsert_many([], index_elements=["name"]) is None
+    assert await _ids(repo) == []
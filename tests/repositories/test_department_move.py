@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import select, text, update
+
+from app.models.departments import DepartmentModel
+from app.repositories.department import DepartmentNotFound, DepartmentRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def repo(app_schema, session) -> DepartmentRepository:
+    await app_schema.execute(text("INSERT INTO companies (id, name) VALUES (1, 'a'), (2, 'b')"))
+    return DepartmentRepository(session)
+
+
+async def _paths(repo: DepartmentRepository, ids: list[int]) -> list[str]:
+    query = select(DepartmentModel.path).where(DepartmentModel.id.in_(ids)).order_by(DepartmentModel.id)
+    return [str(path) for path in (await repo.session.execute(query)).scalars()]
+
+
+async def test_move_rewrites_subtree(repo):
+    root, a, b, a_child, a_leaf = await repo.add_tree(
+        [("root", None), ("a", 0), ("b", 0), ("a.1", 1), ("a.1.1", 3)], company_id=1
+    )
+
+    moved = await repo.move_department_with_descendants(a, b, company_id=1)
+
+    assert moved == 3
+    assert await _paths(repo, [a, a_child, a_leaf]) == [
+        f"{root}.{b}.{a}",
+        f"{root}.{b}.{a}.{a_child}",
+        f"{root}.{b}.{a}.{a_child}.{a_leaf}",
+    ]
+
+
+async def test_move_under_own_descendant_is_rejected(repo):
+    root, child = await repo.add_tree([("root", None), ("child", 0)], company_id=1)
+
+    with pytest.raises(ValueError, match="itself or its descendant"):
+        await repo.move_department_with_descendants(root, child, company_id=1)
+
+
+@pytest.mark.parametrize("missing_path", ["department", "new_parent"])
+async def test_move_without_path_is_rejected(repo, missing_path):
+    department, new_parent = await repo.add_tree([("a", None), ("b", None)], company_id=1)
+    broken = department if missing_path == "department" else new_parent
+    await repo.session.execute(
+        update(DepartmentModel).where(DepartmentModel.id == broken).values(path=None)
+    )
+
+    with pytest.raises(ValueError, match="path is not set") as error:
+        await repo.move_department_with_descendants(department, new_parent, company_id=1)
+
+    assert not isinstance(error.value, DepartmentNotFound)
+
+
+async def test_move_across_companies_is_not_found(repo):
+    (own,) = await repo.add_tree([("own", None)], company_id=1)
+    (foreign,) = await repo.add_tree([("foreign", None)], company_id=2)
+
+    with pytest.raises(DepartmentNotFound, match="New parent"):
+        await repo.move_department_with_descendants(own, foreign, company_id=1)
+    with pytest.raises(DepartmentNotFound, match="^Department not found"):
+        await repo.move_department_with_descendants(foreign, own, company_id=1)
+    assert await _paths(repo, [own, foreign]) == [str(own), str(foreign)]
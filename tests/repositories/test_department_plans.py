@@ -0,0 +1,81 @@
+from typing import NamedTuple
+
+import pytest
+from sqlalchemy import text
+
+from app.repositories.department import DepartmentRepository
+
+pytestmark = pytest.mark.anyio
+
+GIST_INDEXES = ("ix_departments_path_gist", "ix_departments_company_id_path_gist")
+
+
+class Tree(NamedTuple):
+    repo: DepartmentRepository
+    root: int
+    division: int
+    team: int
+    other_company_team: int
+
+
+def _nodes() -> list[tuple[str, int | None]]:
+    # корень, 20 дивизионов, по 100 команд в каждом
+    return (
+        [("root", None)]
+        + [(f"div{d}", 0) for d in range(20)]
+        + [(f"team{d}.{t}", 1 + d) for d in range(20) for t in range(100)]
+    )
+
+
+@pytest.fixture
+async def tree(app_schema, session) -> Tree:
+    connection = app_schema
+    await connection.execute(text("INSERT INTO companies (id, name) VALUES (1, 'a'), (2, 'b')"))
+    repo = DepartmentRepository(session)
+    ids = await repo.add_tree(_nodes(), company_id=1)
+    other_ids = await repo.add_tree(_nodes(), company_id=2)
+    await session.flush()
+
+    await connection.execute(text("ANALYZE departments"))
+    # на маленькой таблице планировщик и так выбрал бы Seq Scan; проверяем, что индекс
+    # вообще применим к запросу — иначе план останется Seq Scan и с этим флагом
+    await connection.execute(text("SET LOCAL enable_seqscan = off"))
+    return Tree(repo, root=ids[0], division=ids[1], team=ids[-1], other_company_team=other_ids[-1])
+
+
+def _assert_gist(repo: DepartmentRepository, plan: list[str]) -> None:
+    assert any(repo.plan_uses_index(plan, index) for index in GIST_INDEXES), "\n".join(plan)
+    assert repo.plan_uses_index(plan), "\n".join(plan)
+
+
+async def test_descendants_query_uses_gist_index(tree: Tree) -> None:
+    plan = await tree.repo.explain(tree.repo._subtree_query(tree.division, company_id=1))
+    _assert_gist(tree.repo, plan)
+
+
+async def test_ancestors_query_uses_gist_index(tree: Tree) -> None:
+    plan = await tree.repo.explain(tree.repo._chain_query(tree.team, company_id=1))
+    _assert_gist(tree.repo, plan)
+
+
+async def test_move_query_uses_gist_index(tree: Tree) -> None:
+    division = await tree.repo.get_columns_by_id(tree.division, ["path"])
+    root = await tree.repo.get_columns_by_id(tree.root, ["path"])
+    plan = await tree.repo.explain(
+        tree.repo._move_query(str(division.path), str(root.path), company_id=1)
+    )
+    _assert_gist(tree.repo, plan)
+
+
+async def test_path_lookups_use_gist_index(tree: Tree) -> None:
+    division = await tree.repo.get_columns_by_id(tree.division, ["path"])
+    plan = await tree.repo.explain_by_query(company_id=1, path__descendant_of=division.path)
+    _assert_gist(tree.repo, plan)
+
+
+async def test_hierarchy_queries_are_scoped_by_company(tree: Tree) -> None:
+    assert len(await tree.repo.get_ancestors_with_names(tree.team, company_id=1)) == 3
+    with pytest.raises(ValueError):
+        await tree.repo.get_ancestors_with_names(tree.other_company_team, company_id=1)
+    with pytest.raises(ValueError):
+        await tree.repo.get_descendants_with_names(tree.other_company_team, company_id=1)
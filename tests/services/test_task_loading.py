@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.services.task import TaskService
+from app.uow.unit_of_work import UnitOfWork
+
+pytestmark = pytest.mark.anyio
+
+PARTICIPANTS = 6
+
+
+class _TestUnitOfWork(UnitOfWork):
+    """Сессии на соединении теста: работа сервиса откатывается вместе с тестом."""
+
+    def __init__(self, connection: AsyncConnection) -> None:
+        super().__init__()
+        self.connection = connection
+
+    async def _open_session(self) -> AsyncSession:
+        # read-only режим не выставить на соединении с открытой транзакцией — не трогаем
+        return AsyncSession(
+            bind=self.connection, expire_on_commit=False, join_transaction_mode="create_savepoint"
+        )
+
+
+class _Statements:
+    """SELECT'ы на соединении и число строк, которые они вернули."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.rows = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        # SAVEPOINT / RELEASE тестовой транзакции не считаем
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.count += 1
+            self.rows += max(cursor.rowcount, 0)
+
+
+@pytest.fixture
+async def service(app_schema) -> TaskService:
+    connection = app_schema
+    await connection.execute(text("INSERT INTO companies (id, name) VALUES (1, 'a')"))
+    await connection.execute(text(
+        "INSERT INTO users (id, email, hashed_password, first_name, last_name,"
+        " is_active, is_admin, company_id)"
+        " SELECT g, 'u' || g || '@example.com', 'x', 'f', 'l', true, false, 1"
+        " FROM generate_series(1, :n) g"
+    ), {"n": PARTICIPANTS})
+    await connection.execute(text(
+        "INSERT INTO tasks (id, title, author_id, responsible_id, status) VALUES (1, 't', 1, 1, 'NEW')"
+    ))
+    for table in ("task_observers", "task_executors"):
+        await connection.execute(
+            text(f"INSERT INTO {table} SELECT 1, g FROM generate_series(1, :n) g"),
+            {"n": PARTICIPANTS},
+        )
+
+    return TaskService(_TestUnitOfWork(connection))
+
+
+@pytest.fixture
+def statements(app_schema) -> _Statements:
+    counter = _Statements()
+    event.listen(app_schema.sync_connection, "after_cursor_execute", counter)
+    yield counter
+    event.remove(app_schema.sync_connection, "after_cursor_execute", counter)
+
+
+async def test_get_task_loads_participants_without_row_multiplication(service, statements):
+    task = await service.get_task(1)
+
+    # задача, наблюдатели и исполнители — по запросу; строк ровно по одной на объект,
+    # а не PARTICIPANTS ** 2, как дал бы JOIN двух коллекций
+    assert statements.count == 3
+    assert statements.rows == 1 + 2 * PARTICIPANTS
+    assert sorted(user.id for user in task.observers) == list(range(1, PARTICIPANTS + 1))
+    assert sorted(user.id for user in task.executors) == list(range(1, PARTICIPANTS + 1))
+
+
+async def test_get_task_missing(service, statements):
+    with pytest.raises(ValueError, match="Task not found"):
+        await service.get_task(2)
+
+    # коллекции для отсутствующей задачи не запрашиваются
+    assert statements.count == 1